@@ -0,0 +1,122 @@
+"""
+Замер пропускной способности рассылки на локальном фейковом Bot API
+
+    python app/benchmarks/broadcast_bench.py --users 2000 --global-rate 30
+
+Фейковый сервер отвечает на sendMessage как Telegram: ok, 403 для части
+получателей (заблокировали бота) и, при --retry-after-rate, 429 с retry_after.
+Отправка идет через тот же MessageDispatcher, что и в приложении
+"""
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+from aiohttp import web
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiogram.exceptions import TelegramForbiddenError
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services"))
+
+from bot.dispatcher import MessageDispatcher
+
+TOKEN = "123456:fake-token-for-benchmark"
+
+
+def create_fake_api(blocked_rate: float, retry_after_rate: float, latency: float) -> web.Application:
+    """Фейковый Bot API"""
+    message_id = 0
+
+    async def send_message(request: web.Request):
+        nonlocal message_id
+        data = await request.post()
+        chat_id = int(data["chat_id"])
+        await asyncio.sleep(latency)
+        if random.random() < retry_after_rate:
+            return web.json_response({
+                "ok": False, "error_code": 429,
+                "description": "Too Many Requests: retry after 1",
+                "parameters": {"retry_after": 1}
+            })
+        # один и тот же получатель всегда блокирует или нет
+        if (chat_id * 2654435761) % 1000 < blocked_rate * 1000:
+            return web.json_response({
+                "ok": False, "error_code": 403,
+                "description": "Forbidden: bot was blocked by the user"
+            })
+        message_id += 1
+        return web.json_response({"ok": True, "result": {
+            "message_id": message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": data.get("text", "")
+        }})
+
+    app = web.Application()
+    app.router.add_post(f"/bot{TOKEN}/sendMessage", send_message)
+    return app
+
+
+async def run(args):
+    runner = web.AppRunner(create_fake_api(args.blocked_rate, args.retry_after_rate, args.latency))
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", args.port)
+    await site.start()
+
+    session = AiohttpSession(api=TelegramAPIServer.from_base(f"http://127.0.0.1:{args.port}"), limit=args.concurrency)
+    bot = Bot(token=TOKEN, session=session)
+    dispatcher = MessageDispatcher(
+        bot,
+        global_rate=args.global_rate,
+        per_chat_rate=args.chat_rate,
+        max_queue=args.batch_size * 2,
+        concurrency=args.concurrency,
+        max_retries=3
+    )
+    await dispatcher.start()
+
+    sent = failed = blocked = 0
+    recipients = list(range(1, args.users + 1))
+    started = time.perf_counter()
+    # как в BroadcastService: пачка в очередь, ожидание результатов, следующая пачка
+    for offset in range(0, len(recipients), args.batch_size):
+        batch = recipients[offset:offset + args.batch_size]
+        futures = [await dispatcher.send_message(chat_id, "benchmark") for chat_id in batch]
+        for result in await asyncio.gather(*futures, return_exceptions=True):
+            if isinstance(result, TelegramForbiddenError):
+                blocked += 1
+            elif isinstance(result, BaseException):
+                failed += 1
+            else:
+                sent += 1
+    elapsed = time.perf_counter() - started
+
+    await dispatcher.stop()
+    await bot.session.close()
+    await runner.cleanup()
+
+    total = sent + failed + blocked
+    print(f"получателей: {total}, отправлено: {sent}, ошибок: {failed}, заблокировали: {blocked}")
+    print(f"время: {elapsed:.2f} с, {total / elapsed:.1f} сообщений/с (лимит {args.global_rate}/с)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк рассылки на фейковом Bot API")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--batch-size", type=int, default=200)
+    parser.add_argument("--global-rate", type=float, default=30)
+    parser.add_argument("--chat-rate", type=float, default=1)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--blocked-rate", type=float, default=0.05)
+    parser.add_argument("--retry-after-rate", type=float, default=0.0)
+    parser.add_argument("--latency", type=float, default=0.02, help="Задержка ответа фейкового API, с")
+    parser.add_argument("--port", type=int, default=8181)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
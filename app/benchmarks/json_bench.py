@@ -0,0 +1,131 @@
+"""
+Сравнение ответа со списком заявок: stdlib json против orjson
+
+    python app/benchmarks/json_bench.py --rows 5000 --repeat 20
+
+Оба варианта меряются запросом GET /application через TestClient, то есть
+через всю обработку маршрута FastAPI (без базы: сервис отдает заявки из памяти).
+Старый путь: SQLAlchemyAutoSchema (datetime в строку), view возвращает dict,
+FastAPI прогоняет его через jsonable_encoder и JSONResponse.
+Новый путь: боевой admin_application_router_v2, ExtendApplicationModelSerializetr
+(нативные datetime) и ORJSONResponse, который view возвращает напрямую
+"""
+import os
+import sys
+import argparse
+import logging
+import timeit
+from datetime import datetime, timedelta
+from fastapi import APIRouter, FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from fastapi.testclient import TestClient
+from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "services"))
+
+from app.services.database.models.applications import ApplicationsLatest
+from app.services.application.serializer import ExtendApplicationModelSerializetr
+from app.services.application.deps import get_application_service
+from app.services.application.views import admin_application_router_v2
+from app.cors.etag import make_etag, etag_matches, not_modified, set_etag
+from app.cors.responses import ORJSONResponse
+
+
+class StdApplicationSerializer(SQLAlchemyAutoSchema):
+    """Сериалайзер как до перехода на NativeAutoSchema"""
+    class Meta:
+        model = ApplicationsLatest
+        load_instance = True
+
+
+def make_applications(rows: int):
+    started = datetime(2025, 1, 1)
+    return [
+        ApplicationsLatest(
+            id=i,
+            full_name=f"Иванов Иван Иванович {i}",
+            creative_skills="Пою, танцую, рисую",
+            phone_number=f"+7900{i:07d}",
+            telegram_id=str(100000000 + i),
+            telegram_user_name=f"user_{i}",
+            vk_username=f"vk_user_{i}",
+            status="active",
+            created_at=started + timedelta(minutes=i)
+        )
+        for i in range(rows)
+    ]
+
+
+class MemoryApplicationService:
+    """Сервис заявок без базы: тот же dump, что в ApplicationService"""
+
+    def __init__(self, applications, serializer):
+        self.applications = applications
+        self.serializer = serializer
+
+    async def applications_etag(self, status: str) -> str:
+        return make_etag("applications", status, 1)
+
+    async def get_applications_by_status(self, status: str):
+        return self.serializer.dump(self.applications, many=True)
+
+
+def make_std_app(service: MemoryApplicationService) -> FastAPI:
+    """Маршрут как до перехода на orjson: dict из view и JSONResponse по умолчанию"""
+    router = APIRouter(prefix="/application")
+
+    @router.get("")
+    async def get_applications_by_status(request: Request, response: Response, status: str):
+        etag = await service.applications_etag(status)
+        if etag_matches(request, etag):
+            return not_modified(etag)
+        applications = await service.get_applications_by_status(status)
+        set_etag(response, etag)
+        return {"details": "ok", "applications": applications}
+
+    app = FastAPI(default_response_class=JSONResponse)
+    app.include_router(router)
+    return app
+
+
+def make_orjson_app(service: MemoryApplicationService) -> FastAPI:
+    """Боевой маршрут заявок"""
+    app = FastAPI(default_response_class=ORJSONResponse)
+    app.include_router(admin_application_router_v2)
+    app.dependency_overrides[get_application_service] = lambda: service
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк JSON ответа со списком заявок")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    # TestClient пишет в лог каждый запрос
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    applications = make_applications(args.rows)
+    clients = {
+        "json": TestClient(make_std_app(MemoryApplicationService(applications, StdApplicationSerializer()))),
+        "orjson": TestClient(make_orjson_app(MemoryApplicationService(applications, ExtendApplicationModelSerializetr()))),
+    }
+
+    def request(client: TestClient):
+        response = client.get("/application", params={"status": "active"})
+        assert response.status_code == 200
+        return response
+
+    bodies = {name: request(client).json() for name, client in clients.items()}
+    assert bodies["json"] == bodies["orjson"], "ответы отличаются"
+
+    results = {}
+    for name, client in clients.items():
+        results[name] = min(timeit.repeat(lambda: request(client), number=1, repeat=args.repeat))
+        print(f"{name:>7}: {results[name] * 1000:.1f} ms на {args.rows} заявок")
+    print(f"ускорение: x{results['json'] / results['orjson']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import hashlib
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import Response
+
+# Ответ можно хранить только в браузере и перед использованием надо перепроверить
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Сильный ETag из частей версии ответа"""
+    digest = hashlib.sha1(":".join(str(part) for part in parts).encode()).hexdigest()[:20]
+    return f'"{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Совпадает ли If-None-Match запроса с etag (слабое сравнение)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 без тела"""
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": CACHE_CONTROL})
+
+
+def set_etag(response: Response, etag: str) -> Response:
+    """Добавление ETag и Cache-Control к ответу"""
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    return response
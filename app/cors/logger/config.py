@@ -9,6 +9,14 @@ LOGGING_CONFIG = {
     "log_to_file": True,
     "max_file_size": 10 * 1024 * 1024,  # 10MB
     "backup_count": 5,
+    # Запись через очередь и отдельный поток (не блокирует event loop)
+    "use_queue": True,
+    # JSON записи (LOG_JSON=1)
+    "json_format": os.getenv("LOG_JSON", "0") == "1",
+    # Доля записей ниже WARNING по модулю, например {"middleware": 0.1}
+    "sampling": {},
+    # Лимит записей ниже WARNING в секунду по модулю, например {"views": 20}
+    "rate_limits": {},
 }
 
 def update_logging_config(**kwargs):
@@ -16,6 +24,6 @@ def update_logging_config(**kwargs):
     global LOGGING_CONFIG
     LOGGING_CONFIG.update(kwargs)
     
-    from logger import AppLogger
+    from app.cors.logger.logger import AppLogger
     AppLogger._initialized = False
     AppLogger.setup_logger(**LOGGING_CONFIG)
\ No newline at end of file
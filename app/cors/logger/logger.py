@@ -1,9 +1,16 @@
 # ../cors/logger.py
 import os
 import sys
+import json
+import time
+import queue
+import atexit
+import random
 import logging
-from logging.handlers import RotatingFileHandler
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from pathlib import Path
+from typing import Dict, Optional
 
 # Создаем папку для логов если её нет
 LOG_DIR = Path(__file__).parent.parent / "logs"
@@ -13,8 +20,56 @@ LOG_DIR.mkdir(exist_ok=True)
 LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
 
+class JsonFormatter(logging.Formatter):
+    """Форматтер записей в одну строку JSON"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            data["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """Пропускает только долю rate записей ниже WARNING"""
+
+    def __init__(self, rate: float):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno >= logging.WARNING or random.random() < self.rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Не больше per_second записей ниже WARNING в секунду (token bucket)"""
+
+    def __init__(self, per_second: float):
+        super().__init__()
+        self.per_second = per_second
+        self._tokens = per_second
+        self._updated = time.monotonic()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        now = time.monotonic()
+        self._tokens = min(self.per_second, self._tokens + (now - self._updated) * self.per_second)
+        self._updated = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+
 class AppLogger:
     _initialized = False
+    _listener: Optional[QueueListener] = None
     
     @classmethod
     def setup_logger(cls, 
@@ -22,7 +77,11 @@ class AppLogger:
                     level: str = "INFO",
                     log_to_file: bool = True,
                     max_file_size: int = 10 * 1024 * 1024,  # 10MB
-                    backup_count: int = 5):
+                    backup_count: int = 5,
+                    use_queue: bool = True,
+                    json_format: bool = False,
+                    sampling: Optional[Dict[str, float]] = None,
+                    rate_limits: Optional[Dict[str, float]] = None):
         """
         Настройка логгера
         
@@ -32,6 +91,10 @@ class AppLogger:
             log_to_file: Записывать ли в файл
             max_file_size: Максимальный размер файла лога
             backup_count: Количество backup файлов
+            use_queue: Писать через очередь: вывод и ротация файла в отдельном потоке
+            json_format: Записи в формате JSON
+            sampling: Доля записей ниже WARNING по модулю, {"middleware": 0.1}
+            rate_limits: Лимит записей ниже WARNING в секунду по модулю, {"views": 20}
         """
         if cls._initialized:
             return logging.getLogger(name)
@@ -44,15 +107,17 @@ class AppLogger:
         
         # Очищаем существующие handlers
         logger.handlers.clear()
+        cls.stop_listener()
         
         # Форматтер
-        formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+        formatter = JsonFormatter() if json_format else logging.Formatter(LOG_FORMAT, DATE_FORMAT)
+        handlers = []
         
         # Console handler
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(log_level)
         console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        handlers.append(console_handler)
         
         # File handler (если включено)
         if log_to_file:
@@ -65,7 +130,23 @@ class AppLogger:
             )
             file_handler.setLevel(log_level)
             file_handler.setFormatter(formatter)
-            logger.addHandler(file_handler)
+            handlers.append(file_handler)
+
+        # Через очередь event loop только кладет запись, I/O и ротация в потоке listener
+        if use_queue:
+            log_queue = queue.SimpleQueue()
+            logger.addHandler(QueueHandler(log_queue))
+            cls._listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+            cls._listener.start()
+        else:
+            for handler in handlers:
+                logger.addHandler(handler)
+
+        # Сэмплирование и лимиты для болтливых модулей
+        for module_name, rate in (sampling or {}).items():
+            logging.getLogger(f"{name}.{module_name}").addFilter(SamplingFilter(rate))
+        for module_name, per_second in (rate_limits or {}).items():
+            logging.getLogger(f"{name}.{module_name}").addFilter(RateLimitFilter(per_second))
         
         # Предотвращаем дублирование логов
         logger.propagate = False
@@ -73,6 +154,13 @@ class AppLogger:
         cls._initialized = True
         return logger
     
+    @classmethod
+    def stop_listener(cls):
+        """Остановка потока записи логов (дописывает очередь)"""
+        if cls._listener is not None:
+            cls._listener.stop()
+            cls._listener = None
+
     @classmethod
     def get_logger(cls, name: str = None):
         """
@@ -94,7 +182,8 @@ class AppLogger:
 # Создаем глобальный логгер по умолчанию
 def setup_default_logger():
     """Настройка логгера по умолчанию при импорте"""
-    return AppLogger.setup_logger()
+    from app.cors.logger.config import LOGGING_CONFIG
+    return AppLogger.setup_logger(**LOGGING_CONFIG)
 
 def get_logger(name: str = None):
     """
@@ -108,6 +197,7 @@ def get_logger(name: str = None):
 
 # Автоматическая настройка при импорте
 setup_default_logger()
+atexit.register(AppLogger.stop_listener)
 
 # Экспортируем основные методы logging для удобства
 info = get_logger().info
@@ -0,0 +1,241 @@
+import hmac
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Метрики пишутся только из потока event loop, поэтому обходятся без блокировок:
+# запись - это обновление словаря/списка, которое не прерывается другим корутинами
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Metric:
+    """Базовая метрика"""
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Счетчик"""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        """Увеличение счетчика для набора значений меток"""
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def samples(self) -> Iterable[str]:
+        for labelvalues, value in list(self._values.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Gauge(Metric):
+    """Значение, которое вычисляется в момент сбора метрик"""
+    type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: List[Callable[[], Iterable[Tuple[LabelValues, float]]]] = []
+
+    def set(self, value: float, *labelvalues: str):
+        self._values[labelvalues] = value
+
+    def set_function(self, function: Callable[[], Iterable[Tuple[LabelValues, float]]]):
+        """Функция, возвращающая пары (значения меток, значение) при сборе"""
+        self._functions.append(function)
+
+    def samples(self) -> Iterable[str]:
+        values = dict(self._values)
+        for function in self._functions:
+            for labelvalues, value in function():
+                values[tuple(labelvalues)] = value
+        for labelvalues, value in values.items():
+            yield f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}"
+
+
+class Histogram(Metric):
+    """Гистограмма с фиксированными границами корзин"""
+    type = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # метки -> [счетчики по корзинам..., +Inf, сумма]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, *labelvalues: str):
+        """Учет одного наблюдения"""
+        data = self._values.get(labelvalues)
+        if data is None:
+            data = self._values[labelvalues] = [0] * (len(self.buckets) + 2)
+        data[bisect_left(self.buckets, value)] += 1
+        data[-1] += value
+
+    def samples(self) -> Iterable[str]:
+        for labelvalues, data in list(self._values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), data[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, labelvalues, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_format_value(data[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class MetricsRegistry:
+    """Реестр метрик процесса"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def _register(self, metric: Metric) -> Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self,
+                  name: str,
+                  documentation: str,
+                  labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus"""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+registry = MetricsRegistry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def metrics_authorized(authorization: Optional[str], token: Optional[str]) -> bool:
+    """
+    Доступ к /metrics по заголовку Authorization: Bearer <token>
+
+    Без настроенного токена метрики закрыты: приложение публичное, а в
+    метриках трафик по маршрутам и статистика бота
+    """
+    if not token or not authorization:
+        return False
+    scheme, _, credentials = authorization.partition(" ")
+    if scheme.lower() != "bearer":
+        return False
+    return hmac.compare_digest(credentials.strip().encode(), token.encode())
+
+http_request_duration = registry.histogram(
+    "http_request_duration_seconds",
+    "Время обработки HTTP запроса",
+    ("method", "route", "status")
+)
+
+db_pool_connections = registry.gauge(
+    "db_pool_connections",
+    "Соединения пула SQLAlchemy",
+    ("pool", "state")
+)
+
+_pools: List[Tuple[str, object]] = []
+
+
+def track_pool(name: str, engine):
+    """Учет соединений пула движка (одноименные пулы суммируются)"""
+    _pools.append((name, engine))
+
+
+def _pool_samples():
+    totals: Dict[Tuple[str, str], float] = {}
+    for name, engine in _pools:
+        pool = engine.pool
+        for state, getter in (("checked_out", "checkedout"), ("overflow", "overflow"), ("size", "size")):
+            function = getattr(pool, getter, None)
+            if function is None:
+                continue
+            key = (name, state)
+            totals[key] = totals.get(key, 0) + function()
+    return totals.items()
+
+
+db_pool_connections.set_function(_pool_samples)
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: гистограмма времени ответа по шаблону маршрута"""
+
+    def __init__(self, app: ASGIApp, histogram: Optional[Histogram] = None):
+        self.app = app
+        self.histogram = histogram or http_request_duration
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        started = time.perf_counter()
+        status = "500"
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = str(message["status"])
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            self.histogram.observe(time.perf_counter() - started, scope["method"], template, status)
@@ -0,0 +1,26 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from starlette.responses import JSONResponse
+
+
+def _default(value: Any):
+    """Типы, которые orjson не сериализует сам"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON ответ через orjson
+
+    datetime, date, UUID и dataclass сериализуются напрямую, без
+    предварительного перевода в строки, Decimal - строкой без потери точности
+    """
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
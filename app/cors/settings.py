@@ -1,5 +1,6 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from pydantic import  ConfigDict
+from typing import Dict, Optional
 
 
 
@@ -13,6 +14,17 @@ class Settings(BaseSettings):
     DB_NAME : str
     DB_PORT : int
 
+    DB_REPLICA_HOST : Optional[str] = None
+    DB_REPLICA_PORT : Optional[int] = None
+
+    REDIS_URL : Optional[str] = None
+    # none, memory, redis. memory сбрасывается только в своем процессе: для нескольких воркеров нужен redis
+    QUERY_CACHE_BACKEND : str = "none"
+    QUERY_CACHE_TTL : int = 60
+    QUERY_CACHE_MODEL_TTL : Dict[str, int] = {}  # {"users": 30, "admins": 0}
+    QUERY_CACHE_SIZE : int = 10000
+    SQL_N_PLUS_ONE_THRESHOLD : int = 10
+
 
     API_ID : str
     API_HASH : str
@@ -22,6 +34,27 @@ class Settings(BaseSettings):
 
     WEBHOOK_TUNNEL_URL : str
     WEB_APP_URL : str
+    TELEGRAM_INIT_DATA_TTL : int = 24 * 3600
+    TELEGRAM_INIT_DATA_CACHE_SIZE : int = 1024
+    TELEGRAM_GLOBAL_RATE : float = 30
+    TELEGRAM_CHAT_RATE : float = 1
+    TELEGRAM_SEND_QUEUE_SIZE : int = 1000
+    TELEGRAM_SEND_CONCURRENCY : int = 8
+    TELEGRAM_SEND_RETRIES : int = 3
+    TELEGRAM_UPDATE_WORKERS : int = 8
+    TELEGRAM_UPDATE_QUEUE_SIZE : int = 1000
+    TELEGRAM_UPDATE_DEDUP_WINDOW : float = 300
+    LEADER_ELECTION_INTERVAL : float = 5
+    ADMIN_ROSTER_TTL : float = 60
+    EXPORT_CACHE_DIR : str = "/tmp/tegger_exports"
+    OUTBOX_BATCH_SIZE : int = 100
+    OUTBOX_POLL_INTERVAL : float = 5
+    OUTBOX_MAX_ATTEMPTS : int = 10
+    PRINCIPAL_CACHE_TTL : int = 30
+    PRINCIPAL_CACHE_NEGATIVE_TTL : int = 5
+    PRINCIPAL_CACHE_SIZE : int = 10000
+    # Bearer токен для /metrics (bearer_token в scrape_config Prometheus), без него /metrics отдает 404
+    METRICS_TOKEN : Optional[str] = None
 
     
     ADMIN_SECRET_TOKEN : str
@@ -38,6 +71,14 @@ class Settings(BaseSettings):
         print(f"URI DB CONNECT {uri}")
         return uri
 
+    @property
+    def AsyncReplicaDataBaseUrl(self) -> Optional[str]:
+        """Url для подключения к реплике (None если реплика не настроена)"""
+        if not self.DB_REPLICA_HOST:
+            return None
+        port = self.DB_REPLICA_PORT or self.DB_PORT
+        return f"postgresql+asyncpg://{self.DB_USER}:{self.DB_PASS}@{self.DB_REPLICA_HOST}:{port}/{self.DB_NAME}"
+
     model_config = ConfigDict(
         env_file_encoding="utf-8",
         case_sensitive=True,
@@ -4,7 +4,7 @@ import asyncio
 import json
 import uvicorn  
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 
@@ -12,29 +12,53 @@ from starlette.middleware.sessions import SessionMiddleware
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from aiogram.types import Update
-from services.bot.bot_aiogram import bot, dp, set_webhook, delete_webhook, WEBHOOK_PATH
+from services.bot.webhook import TelegramWebhookMiddleware
+from services.bot.bot_aiogram import bot, dp, dispatcher, update_pool, admin_roster, set_webhook, WEBHOOK_PATH
 
-from services.database.middleware import db_session_middleware, DBSessionMiddleware
+from services.database.middleware import DBSessionMiddleware, QueryStatsMiddleware
 
 from services.database.models.base import Base
 
 from services.auth.views import  puplic_router, private_router, admin_router, private_router_v2, puplic_router_v2, admin_router_v2
 from services.database.config import engine
+from services.database.leader import LeaderElection
+from app.services.broadcast.service import broadcast_service
+from app.services.bot.outbox import outbox_worker
 from services.admin_panel.setup import AdminSetup
 from services.admin_panel.middleware import AdminAuthMiddleware, admin_auth_middleware
 
 from app.cors.middlevare import MiddlewareRouter
+from app.cors.metrics import registry, metrics_authorized, MetricsMiddleware, CONTENT_TYPE as METRICS_CONTENT_TYPE
 from app.cors.settings import settings
+from app.cors.responses import ORJSONResponse
 from app.cors.logger.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Регистрацию вебхука и рассылки выполняет один процесс из всех воркеров
+leader = LeaderElection(engine, interval=settings.LEADER_ELECTION_INTERVAL)
+
+
+async def on_leader_elected():
+    """Процесс стал лидером"""
+    await set_webhook()
+    await broadcast_service.activate()
+
+
+async def on_leader_lost():
+    """Процесс потерял лидерство"""
+    await broadcast_service.stop()
+
+
 async def start_app():
     """Запуск приложения"""
     try:
         logger.info("start server")
-        await set_webhook()
+        await dispatcher.start()
+        await update_pool.start()
+        await outbox_worker.start()
+        await leader.start(on_leader_elected, on_leader_lost)
+        await admin_roster.refresh()
         logger.info("successful start")
     except Exception as e:
         logger.warn(f"Error starting app: {e}")
@@ -44,7 +68,12 @@ async def stop_app():
     """Остановка приложения"""
     try: 
         logger.info("stop server")
-        await delete_webhook()
+        # вебхук не удаляем: при рестарте по одному воркеру бот остался бы без него
+        await update_pool.stop()
+        await broadcast_service.stop()
+        await leader.stop()
+        await outbox_worker.stop()
+        await dispatcher.stop()
         await bot.session.close()
     except Exception as e:
         logger.warn(f"Error while closing client stream: {e}")
@@ -59,10 +88,12 @@ async def lifespan(app: FastAPI):
     await stop_app()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 
 app.add_middleware(DBSessionMiddleware)
+app.add_middleware(QueryStatsMiddleware)
+app.add_middleware(MetricsMiddleware)
 
 app.add_middleware(
     SessionMiddleware,
@@ -82,6 +113,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Вебхук бота обрабатывается до остальных middleware, поэтому подключается последним
+app.add_middleware(
+    TelegramWebhookMiddleware,
+    path=WEBHOOK_PATH,
+    secret_token=settings.WEBHOOK_SECRET_TOKEN,
+    pool=update_pool,
+    bot=bot
+)
+
 app.include_router(puplic_router)
 app.include_router(private_router)
 app.include_router(admin_router)
@@ -94,17 +134,14 @@ app.include_router(admin_router_v2)
 admin = AdminSetup(app, engine)
 
 
-@app.post(WEBHOOK_PATH)
-async def bot_webhook(request : Request, update: dict):
-    """Обработка всех событий бота"""
-    try:
-        logger.info("ОБрабатываю запрос бот...")
-        telegram_update = Update(**update)
-        await dp.feed_webhook_update(bot, telegram_update)
-        return {"status": "ok"}
-    except Exception as e:
-        return JSONResponse({"details" : str(e)})
-    
+@app.get("/metrics", include_in_schema=False)
+async def metrics(request : Request):
+    """Метрики в формате Prometheus (только с METRICS_TOKEN)"""
+    if not metrics_authorized(request.headers.get("authorization"), settings.METRICS_TOKEN):
+        # 404, а не 401: снаружи endpoint не должен быть виден
+        return Response(status_code=404)
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
     
 
 if __name__ == "__main__":
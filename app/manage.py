@@ -6,7 +6,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from cors.settings import settings
 from app.cors.logger.logger import get_logger
-from services.database.config import create_all_tables, drop_all_tables, create_root
+from services.database.config import create_all_tables, drop_all_tables, create_root, engine
+from services.database.migrations.engine import MigrationEngine
 from services.database.models.base import Base
 
 logger = get_logger(__name__)
@@ -20,6 +21,20 @@ async def migrate():
     await create_all_tables()
     await asyncio.sleep(1)
 
+async def upgrade():
+    """Применение недостающих миграций"""
+    await MigrationEngine(engine).upgrade()
+    await engine.dispose()
+
+async def history():
+    """Список ревизий и их состояние"""
+    migrations = MigrationEngine(engine)
+    pending = {revision.revision for revision in await migrations.pending()}
+    for revision in migrations.revisions():
+        state = "pending" if revision.revision in pending else "applied"
+        logger.info(f"{revision.revision} [{state}] {revision.description}")
+    await engine.dispose()
+
 async def drop():
     logger.info("Удаляем таблицы...")
     await drop_all_tables()
@@ -32,6 +47,10 @@ if __name__ == "__main__":
     func_name = sys.argv[1]
     if func_name == "migrate":
         asyncio.run(migrate())
+    elif func_name == "upgrade":
+        asyncio.run(upgrade())
+    elif func_name == "history":
+        asyncio.run(history())
     elif func_name == "drop":
         asyncio.run(drop())
     elif func_name == "createadmin":
@@ -6,6 +6,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from services.database.models.applications import Applications, Users, ApplicationsLatest
 from services.database.models.user import UsersLatest
+from app.services.auth.principal import principal_cache
+from app.services.bot.admins import admin_roster
 
 class AdminManage:
     USER = UsersLatest
@@ -33,6 +35,18 @@ class UserAdmin(ModelView, model=AdminManage.USER):
         AdminManage.USER.telegram_id,
         AdminManage.USER.created_at
     ]
+
+    async def after_model_change(self, data, model, is_created, request):
+        """Сбрасываем кеш пользователя и список администраторов бота после изменения"""
+        principal_cache.invalidate(model.telegram_id)
+        admin_roster.invalidate()
+        await self.model.objects.invalidate_cache()
+
+    async def after_model_delete(self, model, request):
+        """Сбрасываем кеш пользователя и список администраторов бота после удаления"""
+        principal_cache.invalidate(model.telegram_id)
+        admin_roster.invalidate()
+        await self.model.objects.invalidate_cache()
         
 
 class ApplicationAdmin(ModelView, model=AdminManage.APPLICATION):
@@ -53,4 +67,12 @@ class ApplicationAdmin(ModelView, model=AdminManage.APPLICATION):
         AdminManage.APPLICATION.telegram_user_name,
         AdminManage.APPLICATION.telegram_id,
         AdminManage.APPLICATION.created_at
-    ]
\ No newline at end of file
+    ]
+
+    async def after_model_change(self, data, model, is_created, request):
+        """Сбрасываем кеш заявок после изменения"""
+        await self.model.objects.invalidate_cache()
+
+    async def after_model_delete(self, model, request):
+        """Сбрасываем кеш заявок после удаления"""
+        await self.model.objects.invalidate_cache()
\ No newline at end of file
@@ -1,21 +1,21 @@
 import os
 import sys
 from marshmallow import fields
-from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.services.database.serializer import NativeAutoSchema
 from app.services.database.models.applications import Applications, ApplicationsLatest
 
 
-class ApplicationModelSerializetr(SQLAlchemyAutoSchema):
+class ApplicationModelSerializetr(NativeAutoSchema):
     """Сереалайзер для модели заявки """
     class Meta:
         model = Applications
         load_instance = True
 
 
-class ApplicationToUserSerializer(SQLAlchemyAutoSchema):
+class ApplicationToUserSerializer(NativeAutoSchema):
     """
     Сереалайзер для создания пользователя 
     Нужен для соовместимости с новыми моделями 
@@ -27,7 +27,7 @@ class ApplicationToUserSerializer(SQLAlchemyAutoSchema):
 
 
 
-class ExtendApplicationModelSerializetr(SQLAlchemyAutoSchema):
+class ExtendApplicationModelSerializetr(NativeAutoSchema):
     """Сереалайзер для модели заявки расширенный v2 """
     class Meta:
         model = ApplicationsLatest
@@ -2,14 +2,24 @@ import os
 import sys
 from fastapi import HTTPException
 from typing import Optional
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+from sqlalchemy import select
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from application.schem import ExtendedApplicationRequest, ApplicationRequestV2
+from database.context import get_session
 from app.services.database.models.applications import ApplicationsLatest
 from app.services.database.models.user import UsersLatest
+from app.services.auth.principal import principal_cache
+from app.services.bot.admins import admin_roster
+from app.services.bot.outbox import enqueue_notification
+from app.cors.etag import make_etag
 from app.services.application.serializer import ApplicationModelSerializetr, ExtendApplicationModelSerializetr, ApplicationToUserSerializer
 
+# Чат, куда приходят новые заявки
+ADMIN_CHAT_ID = 7052499758
+
 
 class ApplicationService:
 
@@ -25,33 +35,67 @@ class ApplicationService:
         if applications:
             raise HTTPException(400, "Вы уже отправили заявку")
         application : ApplicationsLatest = await self.application_model.objects.create(**data.model_dump())
+        await enqueue_notification(
+            ADMIN_CHAT_ID,
+            f"Новая заявка\nФИО : {application.full_name}\nНомер телефона : {application.phone_number}\nTelegram : @{application.telegram_user_name}",
+            reply_markup=InlineKeyboardMarkup(inline_keyboard=[[
+                InlineKeyboardButton(text="✅ Принять", callback_data=f"accept_{application.id}"),
+                InlineKeyboardButton(text="❌ Отклонить", callback_data=f"reject_{application.id}")
+            ]])
+        )
         return application
     
-    async def accept_application(self, application_id: int, application_serializer = ApplicationToUserSerializer()):
-        application : Optional[ApplicationsLatest] = await self.application_model.objects.get(application_id)
-        if not application:
+    async def transition(self, application_id: int, status: str) -> ApplicationsLatest:
+        """
+        Перевод активной заявки в status одним UPDATE ... WHERE status = 'active' RETURNING
+
+        Из двух одновременных решений по заявке проходит только одно,
+        второе получает 409
+        """
+        applications = await self.application_model.objects.bulk_update(
+            {"id": application_id, "status": 'active'},
+            {"status": status},
+            returning=True
+        )
+        if applications:
+            return applications[0]
+        if not await self.application_model.objects.exists(id=application_id):
             raise HTTPException(404, 'Заявка не найдена')
-        if application.status != 'active':
-            raise HTTPException(400, 'Заявка не активна')
+        raise HTTPException(409, 'Заявка уже рассмотрена')
+
+    async def accept_application(self, application_id: int, application_serializer = ApplicationToUserSerializer()):
+        application = await self.transition(application_id, 'accept')
         if await self.user_model.objects.exists(telegram_id=application.telegram_id):
-            await application.reject()
+            await self.application_model.objects.bulk_update({"id": application_id}, {"status": 'reject'})
             raise HTTPException(400, 'Пользователь уже зарегистрирован')
         application_serialize_data = application_serializer.dump(application)
         await self.user_model.objects.create(**application_serialize_data)
-        await application.accept()
+        principal_cache.invalidate(application.telegram_id)
+        admin_roster.invalidate_on_commit()
+        await enqueue_notification(application.telegram_id, "Ваша заявка принята")
         return application
     
     async def reject_application(self, application_id: int):
-        application : Optional[ApplicationsLatest] = await self.application_model.objects.get(application_id)
-        if not application:
-            raise HTTPException(404, 'Заявка не найдена')
-        if application.status != 'active':
-            raise HTTPException(400, 'Заявка не активна')
-        await application.reject()
+        application = await self.transition(application_id, 'reject')
+        await enqueue_notification(application.telegram_id, "Ваша заявка отклонена")
         return application
     
+    async def applications_etag(self, status : str) -> str:
+        """ETag списка заявок по статусу без выборки самих заявок"""
+        return make_etag("applications", status, await self.application_model.objects.version())
+
     async def get_applications_by_status(self, status : str, application_serializer = ExtendApplicationModelSerializetr()):
-        applications = await self.application_model.objects.filter(status = status)
+        """
+        Заявки по статусу мимо кеша запросов
+
+        Список отдается с ETag из table_versions, а кеш запросов сбрасывается
+        только в своем процессе: устаревший список со свежим ETag клиент
+        перестал бы перезапрашивать
+        """
+        result = await get_session().execute(
+            select(self.application_model).where(self.application_model.status == status)
+        )
+        applications = list(result.scalars().all())
         if not applications:
             raise HTTPException(404, "Активных заявок пока нет")
         applications : dict = application_serializer.dump(applications, many=True)
@@ -1,20 +1,22 @@
 import os
 import sys
-from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from application.schem import AplicationRequest, ExtendedApplicationRequest, ApplicationRequestV2
-from services.bot.bot_aiogram import send_application_notifications, send_message, send_notification, send_new_application_notification
+from services.bot.bot_aiogram import send_application_notifications, send_message
 from app.services.database.models.applications import Applications, Users
 from app.services.database.context import get_session
 from app.services.application.serializer import ApplicationModelSerializetr
 from app.services.depends import handle_errors_wrraper
 from app.services.application.deps import get_application_service
 from app.services.application.service import ApplicationService
+from app.services.bot.admins import admin_roster
+from app.cors.etag import etag_matches, not_modified, set_etag
+from app.cors.responses import ORJSONResponse
 from app.cors.logger.logger import get_logger
 
 logger = get_logger(__name__)
@@ -23,16 +25,18 @@ application_router = APIRouter(prefix="/application")
 
 
 @application_router.post('')
-async def submit_application(data : AplicationRequest):
+async def submit_application(data : AplicationRequest, response : Response):
     """Хук для отправки заявки"""
     user  : Optional[Users] = await Users.objects.exists(telegram_id = data.telegram_id)
     if user:
         await send_message(data.telegram_id, "Вы уже зарегестрированы")
-        return JSONResponse(content={"details" : "Пользователь уже существует"}, status_code=400)
+        response.status_code = 400
+        return {"details" : "Пользователь уже существует"}
     applications = await Applications.objects.filter(telegram_id = data.telegram_id, status = 'active')
     if applications:
         await send_message(data.telegram_id, "Вы уже отправили заявку")
-        return JSONResponse(content={"details" : "Вы уже отправили заявку"}, status_code=400)
+        response.status_code = 400
+        return {"details" : "Вы уже отправили заявку"}
     application : Applications = await Applications.objects.create(**data.model_dump())
     await send_application_notifications(
                                     id=application.id, 
@@ -41,7 +45,7 @@ async def submit_application(data : AplicationRequest):
                                     telegram_user_name=application.telegram_user_name
                                     )
     await send_message(application.telegram_id, "✅ Заявка отправлена\nВам придет уведомление когда заявка будет рассмотрена")
-    return JSONResponse(content={"details" : "ваша заявка отправлена"}, status_code=200)
+    return {"details" : "ваша заявка отправлена"}
     
 
 admin_application_router = APIRouter(prefix="/application")
@@ -49,46 +53,52 @@ admin_application_router = APIRouter(prefix="/application")
 
 
 @admin_application_router.get('')
-async def view_active_application(status : str):
+async def view_active_application(status : str, response : Response):
     """получаем все заявки по статусу"""
     applications = await Applications.objects.filter(status = status)
     if not applications:
-        return JSONResponse({"details" : "Активных заявок пока нет"}, status_code=404)
+        response.status_code = 404
+        return {"details" : "Активных заявок пока нет"}
     application_serializer = ApplicationModelSerializetr()
     applications : dict = application_serializer.dump(applications, many=True)
-    return JSONResponse({"details" : "ok", "applications" : applications}, status_code=200)
+    return ORJSONResponse({"details" : "ok", "applications" : applications})
 
 
 @admin_application_router.patch('/{application_id}')
-async def change_status_application(application_id : int, status : str):
+async def change_status_application(application_id : int, status : str, response : Response):
     """Меняем статус заявк принимаем либо откланяем"""
     application : Optional[Applications] = await Applications.objects.get(application_id)
     if not application:
-        return JSONResponse({'details':'заявка не найдена'}, status_code=404)
+        response.status_code = 404
+        return {'details':'заявка не найдена'}
     if application.status != 'active':
         print('заявка не активна')
-        return JSONResponse({'details':'заявка не активна'}, status_code=400)
+        response.status_code = 400
+        return {'details':'заявка не активна'}
     if status == 'accept':
         user = await Users.objects.exists(telegram_id = application.telegram_id)
         if user: 
             await application.reject()
             print('Пользователь уже зарегестрирован')
-            return JSONResponse({'details':'Пользователь уже зарегестрирован'}, status_code=400)
+            response.status_code = 400
+            return {'details':'Пользователь уже зарегестрирован'}
         await Users.objects.create(
             full_name=application.full_name, 
             phone_number=application.phone_number, 
             telegram_id=application.telegram_id, 
             telegram_user_name=application.telegram_user_name
             )
+        admin_roster.invalidate_on_commit()
         await send_message(application.telegram_id, "Ваша заявка принята")
     elif status == 'reject': 
         await send_message(application.telegram_id, "К сожалению ваша заявка отклонена")
     else: 
         print('неверный статус')
-        return JSONResponse({"details":"неверный статус"}, status_code=400)
+        response.status_code = 400
+        return {"details":"неверный статус"}
     application.status = status
     await application.save()
-    return JSONResponse({'details': 'ok'}, status_code=200)
+    return {'details': 'ok'}
 
 
 
@@ -104,20 +114,12 @@ public_application_router_v2 = APIRouter(prefix="/application")
 @public_application_router_v2.post('')
 async def submit_an_application(
                 data : ApplicationRequestV2, 
-                background : BackgroundTasks, 
                 service : ApplicationService = Depends(get_application_service), 
                 ):
     """Подача заявки"""
     application = await service.submit_an_application(data)
-    print(application.id)
-    background.add_task(
-        send_new_application_notification, 
-        chat_id = 7052499758, 
-        text =  f"Новая заявка\nФИО : {application.full_name}\nНомер телефона : {application.phone_number}\nTelegram : @{application.telegram_user_name}", 
-        application_id = int(application.id)
-        )
     logger.info(f"Подача заявки {application.telegram_user_name}")
-    return JSONResponse({"details" : "ok"}, status_code=200, background=background)
+    return {"details" : "ok"}
    
 
    
@@ -129,32 +131,33 @@ admin_application_router_v2 = APIRouter(prefix="/application")
 async def accept_application(
                 request : Request, 
                 application_id : int,
-                background : BackgroundTasks,  
                 service : ApplicationService = Depends(get_application_service)):
     """Принимаем заявку"""
     application = await service.accept_application(application_id)
-    background.add_task(send_notification, application.telegram_id, "Ваша заявка принята")
     logger.info(f"Прием заявки user : {request.state.user.telegram_user_name} - application :{application.telegram_user_name}")
-    return JSONResponse({"details" : "ok"}, status_code=200, background=background)
+    return {"details" : "ok"}
 
 @handle_errors_wrraper()    
 @admin_application_router_v2.patch('/{application_id}/reject')
 async def reject_application(
                 request : Request, 
                 application_id : int, 
-                background : BackgroundTasks, 
                 service : ApplicationService = Depends(get_application_service)):
     """Отклоням заявку"""
     application = await service.reject_application(application_id)
-    background.add_task(send_notification, application.telegram_id, "Ваша заявка отклонена")
     logger.info(f"Отклонение заявки user : {request.state.user.telegram_user_name} - application :{application.telegram_user_name}")
-    return JSONResponse({"details" : "ok"}, status_code=200)
+    return {"details" : "ok"}
 
 @handle_errors_wrraper()    
 @admin_application_router_v2.get('')
 async def get_applications_by_status(
+    request : Request,
     status : str, 
     service : ApplicationService = Depends(get_application_service)):
     """Получаем заявки по статусу"""
+    etag = await service.applications_etag(status)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     applications = await service.get_applications_by_status(status)
-    return JSONResponse({"details" : "ok", "applications" : applications}, status_code=200)
+    # готовый ORJSONResponse: FastAPI не прогоняет список через jsonable_encoder
+    return set_etag(ORJSONResponse({"details" : "ok", "applications" : applications}), etag)
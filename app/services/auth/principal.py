@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cors.settings import settings
+
+
+class PrincipalCache:
+    """
+    In-process TTL кеш пользователей по telegram_id
+
+    Хранит как найденных пользователей, так и отрицательные результаты
+    (пользователь не зарегистрирован) с отдельным, более коротким TTL.
+    Пользователь хранится снимком колонок (BaseManager.snapshot), а не
+    ORM объектом: объект привязан к сессии запроса, который его загрузил.
+    invalidate сбрасывает запись только в своем процессе, в остальных
+    изменения применятся не позже чем через ttl
+    """
+
+    def __init__(self, ttl: float = 30, negative_ttl: float = 5, maxsize: int = 10000):
+        """
+        Args:
+            ttl: Время жизни найденного пользователя в секундах
+            negative_ttl: Время жизни отрицательного результата в секундах
+            maxsize: Максимальное количество записей
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        # telegram_id -> (expires_at, снимок пользователя | None)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, telegram_id: str) -> Tuple[bool, Optional[Any]]:
+        """Возвращает (найдено ли в кеше, снимок пользователя или None)"""
+        key = str(telegram_id)
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, user
+            del self._entries[key]
+        self.misses += 1
+        return False, None
+
+    def set(self, telegram_id: str, user: Optional[Dict[str, Any]]):
+        """Сохранение снимка пользователя (или None если его нет)"""
+        ttl = self.ttl if user is not None else self.negative_ttl
+        key = str(telegram_id)
+        self._entries[key] = (time.monotonic() + ttl, user)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, telegram_id: Optional[str] = None):
+        """Сброс записи по telegram_id, без аргумента сбрасывает весь кеш"""
+        if telegram_id is None:
+            self._entries.clear()
+            return
+        self._entries.pop(str(telegram_id), None)
+
+    def stats(self) -> dict:
+        """Счетчики попаданий для подбора размера кеша"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+principal_cache = PrincipalCache(
+    ttl=settings.PRINCIPAL_CACHE_TTL,
+    negative_ttl=settings.PRINCIPAL_CACHE_NEGATIVE_TTL,
+    maxsize=settings.PRINCIPAL_CACHE_SIZE
+)
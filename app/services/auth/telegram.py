@@ -0,0 +1,116 @@
+import hashlib
+import hmac
+import json
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+
+JSON_FIELDS = ('user', 'receiver', 'chat')
+
+
+class TelegramInitDataVerifier:
+    """
+    Верификация initData Telegram Web App
+
+    Секретный ключ вычисляется один раз при создании объекта,
+    строка initData разбирается один раз, а уже проверенные строки
+    хранятся в ограниченном LRU кеше (по sha256 строки) до истечения
+    auth_date + max_age. Данные старше max_age отклоняются
+    """
+
+    def __init__(self, bot_token: str, max_age: int = 24 * 3600, cache_size: int = 1024):
+        """
+        Args:
+            bot_token: Токен бота
+            max_age: Срок действия initData в секундах (от auth_date)
+            cache_size: Максимальное количество строк в кеше
+        """
+        self.max_age = max_age
+        self.cache_size = cache_size
+        self._secret_key = hmac.new(
+            key=b"WebAppData",
+            msg=bot_token.encode(),
+            digestmod=hashlib.sha256
+        ).digest()
+        # sha256(initData) -> (expires_at, parsed_data)
+        self._cache: "OrderedDict[bytes, Tuple[float, Dict]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def verify(self, init_data: str) -> Optional[Dict]:
+        """Проверка подписи и срока действия, возвращает разобранные данные или None"""
+        now = time.time()
+        key = hashlib.sha256(init_data.encode()).digest()
+        cached = self._cache.get(key)
+        if cached is not None:
+            expires_at, data = cached
+            if expires_at > now:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return data
+            del self._cache[key]
+        self.misses += 1
+        data = self._verify(init_data, now)
+        if data is None:
+            return None
+        expires_at = self._expires_at(data)
+        if expires_at is None or expires_at <= now:
+            # подпись верна, но initData просрочен (или без auth_date)
+            return None
+        self._cache[key] = (expires_at, data)
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return data
+
+    def get_user_id(self, init_data: str) -> Optional[int]:
+        """Получение user_id из initData с верификацией"""
+        data = self.verify(init_data)
+        if not data:
+            return None
+        user_data = data.get('user')
+        if isinstance(user_data, dict) and 'id' in user_data:
+            return user_data['id']
+        return None
+
+    def clear(self):
+        """Очистка кеша"""
+        self._cache.clear()
+
+    def _verify(self, init_data: str, now: float) -> Optional[Dict]:
+        """Разбор и проверка подписи без кеша"""
+        try:
+            pairs = urllib.parse.parse_qsl(init_data, keep_blank_values=True)
+        except ValueError:
+            return None
+        params = {}
+        for key, value in pairs:
+            params.setdefault(key, value)
+        received_hash = params.pop('hash', None)
+        if not received_hash:
+            return None
+        data_check_string = "\n".join(f"{key}={params[key]}" for key in sorted(params))
+        computed_hash = hmac.new(
+            key=self._secret_key,
+            msg=data_check_string.encode(),
+            digestmod=hashlib.sha256
+        ).hexdigest()
+        if not hmac.compare_digest(computed_hash, received_hash):
+            return None
+        data: Dict = dict(params)
+        try:
+            for key in JSON_FIELDS:
+                if key in data:
+                    data[key] = json.loads(data[key])
+        except ValueError:
+            return None
+        return data
+
+    def _expires_at(self, data: Dict) -> Optional[float]:
+        """Время истечения initData по auth_date, None если auth_date нет"""
+        try:
+            auth_date = int(data.get('auth_date'))
+        except (TypeError, ValueError):
+            return None
+        return auth_date + self.max_age
@@ -1,19 +1,18 @@
 import os
 import sys
-import hashlib
-import hmac
-import urllib.parse
-from typing import Dict, Optional
 from fastapi import APIRouter, Request, Depends, HTTPException
 
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.services.user.views import user_router, private_user_router, private_user_router_v2
+from app.services.user.views import user_router, private_user_router, private_user_router_v2, admin_user_router_v2
 from app.services.application.views import application_router, admin_application_router, admin_application_router_v2, public_application_router_v2
+from app.services.broadcast.views import admin_broadcast_router_v2
 from app.cors.settings import settings
 from app.services.database.models.applications import Users
 from app.services.database.models.user import UsersLatest
+from app.services.auth.telegram import TelegramInitDataVerifier
+from app.services.auth.principal import principal_cache
 from app.cors.logger.logger import get_logger
 
 
@@ -22,59 +21,11 @@ logger = get_logger(__name__)
 DEV = False
 
 
-def verify_telegram_init_data(init_data: str, bot_token: str) -> bool:
-    """Верификация подписи Telegram Web App initData"""
-    try:
-        parsed_data = urllib.parse.parse_qs(init_data)
-        received_hash = parsed_data.get('hash', [''])[0]
-        if not received_hash:
-            return False
-        data_check_string_parts = []
-        for key in sorted(parsed_data.keys()):
-            if key != 'hash':
-                value = parsed_data[key][0]
-                data_check_string_parts.append(f"{key}={value}")
-        
-        data_check_string = "\n".join(data_check_string_parts)
-        secret_key = hmac.new(
-            key=b"WebAppData",
-            msg=bot_token.encode(),
-            digestmod=hashlib.sha256
-        ).digest()
-        computed_hash = hmac.new(
-            key=secret_key,
-            msg=data_check_string.encode(),
-            digestmod=hashlib.sha256
-        ).hexdigest()
-        return computed_hash == received_hash
-    except Exception:
-        return False
-
-def parse_telegram_init_data(init_data: str) -> Dict:
-    """Парсинг initData и извлечение пользовательских данных"""
-    parsed_data = {}
-    try:
-        params = urllib.parse.parse_qs(init_data) 
-        for key, value in params.items():
-            if key in ['user', 'receiver', 'chat']:
-                import json
-                parsed_data[key] = json.loads(value[0])
-            else:
-                parsed_data[key] = value[0] if len(value) == 1 else value
-    except Exception as e:
-        print(f"Error parsing initData: {e}")
-        
-    return parsed_data
-
-def get_user_id_from_init_data(init_data: str, bot_token: str) -> Optional[int]:
-    """Получение user_id из initData с верификацией"""
-    if not verify_telegram_init_data(init_data, bot_token):
-        return None
-    data = parse_telegram_init_data(init_data)
-    user_data = data.get('user')
-    if user_data and 'id' in user_data:
-        return user_data['id']
-    return None
+init_data_verifier = TelegramInitDataVerifier(
+    settings.TOKEN_BOT,
+    max_age=settings.TELEGRAM_INIT_DATA_TTL,
+    cache_size=settings.TELEGRAM_INIT_DATA_CACHE_SIZE
+)
 
 
 class CheckTelegramMiddleware:
@@ -87,7 +38,10 @@ class CheckTelegramMiddleware:
         if not init_data:
             logger.warn(f"Запрос не с телеграма | на {request.base_url.path} c {request.client.host}")
             raise HTTPException(detail="init data не передан", status_code=401)
-        user_id = get_user_id_from_init_data(init_data, settings.TOKEN_BOT)
+        user_id = init_data_verifier.get_user_id(init_data)
+        if user_id is None:
+            logger.warn(f"Неверная подпись init data | на {request.base_url.path} c {request.client.host}")
+            raise HTTPException(detail="init data не прошел проверку", status_code=401)
         return str(user_id)
 
 
@@ -97,7 +51,13 @@ class AuthMiddleware:
         logger.info("Аунтификация пользователя")
         if DEV:
             return request
-        user = await UsersLatest.objects.get_by_field("telegram_id", user_id)
+        found, snapshot = principal_cache.get(user_id)
+        if found:
+            # снимок привязывается к сессии этого запроса без обращения к базе
+            user = await UsersLatest.objects.from_snapshot(snapshot)
+        else:
+            user = await UsersLatest.objects.get_by_field("telegram_id", user_id)
+            principal_cache.set(user_id, UsersLatest.objects.snapshot(user))
         if not user:
             logger.warn(f"Не зарегестрированный пользователь | на {request.base_url.path} c {request.client.host}")
             raise HTTPException(detail="Вы не зарегестрированны", status_code=401)
@@ -139,3 +99,5 @@ puplic_router_v2.include_router(public_application_router_v2)
 private_router_v2.include_router(private_user_router_v2)
 
 admin_router_v2.include_router(admin_application_router_v2)
+admin_router_v2.include_router(admin_broadcast_router_v2)
+admin_router_v2.include_router(admin_user_router_v2)
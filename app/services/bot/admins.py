@@ -0,0 +1,84 @@
+import os
+import sys
+import time
+import asyncio
+from typing import Optional, Set
+from sqlalchemy import select
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cors.settings import settings
+from database.config import async_session
+from database.context import get_session, lazy_session, on_commit
+from app.services.database.models.applications import Users
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class AdminRoster:
+    """
+    Множество telegram_id администраторов бота
+
+    Загружается одним запросом и обновляется по TTL (или после invalidate),
+    проверка прав - поиск в множестве без обращения к базе. invalidate
+    действует только в своем процессе, в остальных изменение прав
+    применится не позже чем через ttl
+    """
+
+    def __init__(self, model, ttl: float = 60, session_factory = async_session):
+        """
+        Args:
+            model: Модель пользователей с полями telegram_id, is_active, is_admin
+            ttl: Время жизни списка в секундах
+            session_factory: Фабрика сессий основной базы
+        """
+        self.model = model
+        self.ttl = ttl
+        self.session_factory = session_factory
+        self._ids: Optional[Set[str]] = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def refresh(self):
+        """Загрузка списка администраторов"""
+        async with self._lock:
+            async with lazy_session(self.session_factory):
+                result = await get_session(read_only=False).scalars(
+                    select(self.model.telegram_id).where(
+                        self.model.is_active.is_(True),
+                        self.model.is_admin.is_(True)
+                    )
+                )
+                self._ids = set(result)
+            self._expires_at = time.monotonic() + self.ttl
+        logger.info(f"Список администраторов бота обновлен: {len(self._ids)}")
+
+    def invalidate(self):
+        """Список будет перечитан при следующей проверке"""
+        self._expires_at = 0.0
+
+    def invalidate_on_commit(self):
+        """Сброс списка после коммита текущей сессии (до коммита перечитали бы старые права)"""
+        on_commit(get_session(read_only=False), self._invalidate, key="admin_roster_invalidate")
+
+    async def _invalidate(self):
+        self.invalidate()
+
+    async def is_admin(self, telegram_id) -> bool:
+        """Является ли пользователь администратором"""
+        if self._expires_at <= time.monotonic() and not self._lock.locked():
+            try:
+                await self.refresh()
+            except Exception as e:
+                if self._ids is None:
+                    raise
+                logger.error(f"Не удалось обновить список администраторов: {e}")
+        elif self._ids is None:
+            # первая загрузка уже идет в другой задаче
+            async with self._lock:
+                pass
+        return str(telegram_id) in (self._ids or ())
+
+
+admin_roster = AdminRoster(Users, ttl=settings.ADMIN_ROSTER_TTL)
@@ -16,7 +16,10 @@ from cors.settings import settings
 from app.services.database.models.applications import Applications, Users
 
 from bot.schem import AplicationRequest, ApplicationScheme, UserSheme
-from bot.views import admin_router
+from bot.views import admin_router, admin_roster
+from bot.middleware import UpdateMetricsMiddleware
+from bot.client import bot, dispatcher
+from bot.workers import UpdateWorkerPool
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -25,10 +28,18 @@ WEBHOOK_PATH = f"/bot/{settings.TOKEN_BOT}"
 WEBHOOK_URL = f"{settings.WEBHOOK_TUNNEL_URL}{WEBHOOK_PATH}"
 
 
-bot = Bot(token=settings.TOKEN_BOT)
 dp = Dispatcher()
+dp.update.outer_middleware(UpdateMetricsMiddleware())
 dp.include_router(admin_router)
 
+update_pool = UpdateWorkerPool(
+    dp,
+    bot,
+    workers=settings.TELEGRAM_UPDATE_WORKERS,
+    max_queue=settings.TELEGRAM_UPDATE_QUEUE_SIZE,
+    dedup_window=settings.TELEGRAM_UPDATE_DEDUP_WINDOW
+)
+
 
 logger = logging.getLogger(__name__)
 
@@ -64,7 +75,7 @@ async def set_webhook():
     await bot.set_webhook(
         url=WEBHOOK_URL,
         secret_token=settings.WEBHOOK_SECRET_TOKEN,
-        drop_pending_updates=True,
+        drop_pending_updates=False,
         allowed_updates=["message", "callback_query", "web_app_data"]
     )
     logger.info(f"✅ Вебхук установлен: {WEBHOOK_URL}")
@@ -86,14 +97,14 @@ async def send_application_notifications(id, full_name, phone_number, telegram_u
                 ]
             ]
         )                   
-    await bot.send_message(
+    await dispatcher.send_message(
         7052499758, 
         f"Новая заявка\nФИО : {full_name}\nНомер телефона : {phone_number}\nTelegram : @{telegram_user_name}", 
         reply_markup=inline_keyboard
     )
 
 async def send_message(chat_id, text):
-    await bot.send_message(chat_id, text)
+    await dispatcher.send_message(chat_id, text)
 
 
 async def send_notification(
@@ -101,7 +112,7 @@ async def send_notification(
                         text, 
                         keyboard = None
                     ):
-    await bot.send_message(chat_id, text, reply_markup=keyboard)
+    await dispatcher.send_message(chat_id, text, reply_markup=keyboard)
 
 
 async def send_new_application_notification(chat_id, text, application_id):
@@ -114,7 +125,7 @@ async def send_new_application_notification(chat_id, text, application_id):
                 ]
             ]
         )                   
-    await bot.send_message(
+    await dispatcher.send_message(
         chat_id, 
         text,
         reply_markup=inline_keyboard
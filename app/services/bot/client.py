@@ -0,0 +1,24 @@
+import os
+import sys
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cors.settings import settings
+from bot.middleware import RequestMetricsMiddleware
+from bot.dispatcher import MessageDispatcher
+
+
+# Одна aiohttp сессия на процесс, пул соединений по числу воркеров диспетчера
+bot = Bot(token=settings.TOKEN_BOT, session=AiohttpSession(limit=settings.TELEGRAM_SEND_CONCURRENCY))
+bot.session.middleware(RequestMetricsMiddleware())
+
+dispatcher = MessageDispatcher(
+    bot,
+    global_rate=settings.TELEGRAM_GLOBAL_RATE,
+    per_chat_rate=settings.TELEGRAM_CHAT_RATE,
+    max_queue=settings.TELEGRAM_SEND_QUEUE_SIZE,
+    concurrency=settings.TELEGRAM_SEND_CONCURRENCY,
+    max_retries=settings.TELEGRAM_SEND_RETRIES
+)
@@ -0,0 +1,294 @@
+import os
+import sys
+import time
+import asyncio
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Set
+from aiogram import Bot
+from aiogram.exceptions import TelegramRetryAfter, TelegramNetworkError, TelegramServerError
+from aiogram.methods import TelegramMethod, SendMessage
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не больше capacity подряд"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+
+    @property
+    def full(self) -> bool:
+        """Бакет полностью восстановился (им давно не пользовались)"""
+        self._refill()
+        return self._tokens >= self.capacity and self._paused_until <= time.monotonic()
+
+    def pause(self, seconds: float):
+        """Запрет выдачи токенов на seconds секунд (ответ 429)"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def delay(self) -> float:
+        """Сколько секунд ждать до появления токена, 0 - токен есть"""
+        now = time.monotonic()
+        if self._paused_until > now:
+            return self._paused_until - now
+        self._refill()
+        if self._tokens >= 1:
+            return 0.0
+        return (1 - self._tokens) / self.rate
+
+    def take(self):
+        """Забрать токен (после проверки delay() == 0)"""
+        self._refill()
+        self._tokens -= 1
+
+    async def acquire(self):
+        """Ожидание и получение одного токена"""
+        while True:
+            delay = self.delay()
+            if delay <= 0:
+                self.take()
+                return
+            await asyncio.sleep(delay)
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+@dataclass
+class _Outgoing:
+    method: TelegramMethod
+    future: asyncio.Future
+    attempts: int = 0
+
+
+@dataclass
+class _ChatState:
+    """Очередь и лимит одного чата"""
+    bucket: TokenBucket
+    messages: Deque[_Outgoing] = field(default_factory=deque)
+    # чат стоит в очереди готовых (или его обслуживает воркер), не больше одного раза
+    scheduled: bool = False
+    # пауза после сетевой ошибки
+    not_before: float = 0.0
+
+
+class MessageDispatcher:
+    """
+    Очередь исходящих запросов к Bot API с ограничением скорости
+
+    Общий token bucket (~30 сообщений/с) и бакеты по чатам (~1 сообщение/с).
+    У каждого чата своя FIFO очередь, воркеры берут из общей очереди только
+    чаты, которые уже могут отправлять: чат, которому рано, откладывается
+    таймером и не занимает воркер. Поэтому длинная очередь в один чат не
+    задерживает остальные. Повтор после TelegramRetryAfter через retry_after
+    секунд, сообщения в один чат уходят в порядке постановки в очередь
+    """
+
+    def __init__(self,
+                 bot: Bot,
+                 global_rate: float = 30,
+                 per_chat_rate: float = 1,
+                 max_queue: int = 1000,
+                 concurrency: int = 8,
+                 max_retries: int = 3):
+        """
+        Args:
+            bot: Бот, через сессию которого идут запросы
+            global_rate: Сообщений в секунду на весь бот
+            per_chat_rate: Сообщений в секунду в один чат
+            max_queue: Сообщений в очереди, submit ждет при переполнении
+            concurrency: Количество одновременных запросов
+            max_retries: Повторов после 429 и сетевых ошибок
+        """
+        self.bot = bot
+        self.per_chat_rate = per_chat_rate
+        self.max_queue = max_queue
+        self.concurrency = concurrency
+        self.max_retries = max_retries
+        self._global_bucket = TokenBucket(global_rate)
+        self._chats: Dict[Any, _ChatState] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._timers: Set[asyncio.TimerHandle] = set()
+        self._pending = 0
+        self._workers: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество неотправленных сообщений"""
+        return self._pending
+
+    async def start(self):
+        """Запуск воркеров"""
+        if self.running:
+            return
+        self._ready = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_queue)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        logger.info(f"Диспетчер сообщений запущен: {self.concurrency} воркеров")
+
+    async def stop(self, timeout: float = 10):
+        """Остановка: дожидаемся отправки очереди не дольше timeout секунд"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warn(f"Диспетчер остановлен, не отправлено сообщений: {self._pending}")
+        for timer in self._timers:
+            timer.cancel()
+        self._timers.clear()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        # неотправленное отклоняем: после start() очередь готовых чатов новая,
+        # и чаты с scheduled = True в нее бы уже не попали
+        for chat in self._chats.values():
+            while chat.messages:
+                self._finish(chat, exception=RuntimeError("Диспетчер сообщений остановлен"))
+            chat.scheduled = False
+            chat.not_before = 0.0
+
+    async def submit(self, method: TelegramMethod) -> asyncio.Future:
+        """
+        Постановка запроса в очередь
+
+        Возвращает future с результатом запроса. Ждет только при заполненной очереди
+        """
+        if not self.running:
+            await self.start()
+        await self._slots.acquire()
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        chat_id = getattr(method, "chat_id", None)
+        chat = self._chat(chat_id)
+        chat.messages.append(_Outgoing(method, future))
+        self._pending += 1
+        self._idle.clear()
+        if not chat.scheduled:
+            chat.scheduled = True
+            self._ready.put_nowait(chat_id)
+        return future
+
+    async def send_message(self, chat_id, text: str, **kwargs) -> asyncio.Future:
+        """Постановка sendMessage в очередь"""
+        return await self.submit(SendMessage(chat_id=chat_id, text=text, **kwargs))
+
+    async def _worker(self):
+        while True:
+            chat_id = await self._ready.get()
+            chat = self._chats.get(chat_id)
+            if chat is None or not chat.messages:
+                if chat is not None:
+                    chat.scheduled = False
+                continue
+            try:
+                await self._serve(chat_id, chat)
+            except Exception as e:
+                # непредвиденная ошибка: отказываемся от первого сообщения, чат не теряем
+                self._finish(chat, exception=e)
+                self._reschedule(chat_id, chat)
+
+    async def _serve(self, chat_id, chat: _ChatState):
+        """Отправка первого сообщения чата, если лимит чата позволяет"""
+        delay = max(chat.bucket.delay(), chat.not_before - time.monotonic())
+        if delay > 0:
+            self._schedule(chat_id, delay)
+            return
+        item = chat.messages[0]
+        await self._global_bucket.acquire()
+        chat.bucket.take()
+        try:
+            result = await self.bot(item.method)
+        except TelegramRetryAfter as e:
+            if item.attempts >= self.max_retries:
+                self._finish(chat, exception=e)
+            else:
+                item.attempts += 1
+                logger.warn(f"429 от Telegram, повтор через {e.retry_after} с")
+                self._global_bucket.pause(e.retry_after)
+                chat.bucket.pause(e.retry_after)
+        except (TelegramNetworkError, TelegramServerError) as e:
+            if item.attempts >= self.max_retries:
+                self._finish(chat, exception=e)
+            else:
+                chat.not_before = time.monotonic() + 2 ** item.attempts
+                item.attempts += 1
+        except Exception as e:
+            self._finish(chat, exception=e)
+        else:
+            self._finish(chat, result=result)
+        self._reschedule(chat_id, chat)
+
+    def _finish(self, chat: _ChatState, result: Any = None, exception: Optional[BaseException] = None):
+        """Первое сообщение чата обработано"""
+        item = chat.messages.popleft()
+        if not item.future.done():
+            if exception is not None:
+                item.future.set_exception(exception)
+            else:
+                item.future.set_result(result)
+        self._pending -= 1
+        self._slots.release()
+        if not self._pending:
+            self._idle.set()
+
+    def _reschedule(self, chat_id, chat: _ChatState):
+        """Чат снова в очередь готовых, если в нем остались сообщения"""
+        if chat.messages:
+            self._schedule(chat_id, max(chat.bucket.delay(), chat.not_before - time.monotonic()))
+        else:
+            chat.scheduled = False
+
+    def _schedule(self, chat_id, delay: float):
+        if delay <= 0:
+            self._ready.put_nowait(chat_id)
+            return
+        timer = None
+
+        def wake():
+            self._timers.discard(timer)
+            self._ready.put_nowait(chat_id)
+
+        timer = asyncio.get_running_loop().call_later(delay, wake)
+        self._timers.add(timer)
+
+    def _chat(self, chat_id) -> _ChatState:
+        chat = self._chats.get(chat_id)
+        if chat is None:
+            if len(self._chats) >= self.max_queue:
+                self._prune()
+            chat = self._chats[chat_id] = _ChatState(TokenBucket(self.per_chat_rate, capacity=1))
+        return chat
+
+    def _prune(self):
+        """Удаление простаивающих чатов, у которых лимит уже восстановился"""
+        for chat_id, chat in list(self._chats.items()):
+            if not chat.messages and not chat.scheduled and chat.bucket.full:
+                del self._chats[chat_id]
+
+
+def _consume_exception(future: asyncio.Future):
+    """Ошибка отправки в лог, чтобы asyncio не ругался на непрочитанный future"""
+    if not future.cancelled() and future.exception() is not None:
+        logger.warn(f"Сообщение не отправлено: {future.exception()}")
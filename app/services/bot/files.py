@@ -0,0 +1,108 @@
+import os
+import sys
+import asyncio
+import hashlib
+from typing import Optional, Union
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.types import BufferedInputFile, FSInputFile, Message
+from sqlalchemy.dialects.postgresql import insert
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.context import get_session, save_changes
+from database.models.telegram_file import TelegramFile
+from bot.client import bot as default_bot
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+Content = Union[str, bytes]
+
+# Части текста ошибок Telegram о недействительном file_id
+# ("wrong file identifier/HTTP URL specified", "wrong remote file identifier specified",
+# "FILE_REFERENCE_EXPIRED")
+INVALID_FILE_ID_MARKERS = ("file identifier", "file reference", "file_reference")
+
+
+def _hash_file(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for block in iter(lambda: file.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def content_hash(content: Content) -> str:
+    """sha256 файла (путь) или байтов, чтение файла вне event loop"""
+    if isinstance(content, bytes):
+        return hashlib.sha256(content).hexdigest()
+    return await asyncio.to_thread(_hash_file, content)
+
+
+def is_invalid_file_id(error: TelegramBadRequest) -> bool:
+    """Telegram отверг именно file_id (а не чат, подпись или разметку)"""
+    message = str(error.message).lower()
+    return any(marker in message for marker in INVALID_FILE_ID_MARKERS)
+
+
+class DocumentSender:
+    """
+    Отправка документов с повторным использованием file_id
+
+    После первой загрузки file_id, который вернул Telegram, сохраняется в
+    telegram_files по sha256 содержимого. Тот же документ дальше отправляется
+    по file_id без повторной загрузки байтов
+    """
+
+    def __init__(self, bot: Bot = default_bot):
+        self.bot = bot
+
+    async def send(self, chat_id, content: Content, filename: str, **kwargs) -> Message:
+        """
+        Отправка документа
+
+        Args:
+            chat_id: Чат получателя
+            content: Путь к файлу или содержимое
+            filename: Имя файла у получателя
+            **kwargs: Остальные параметры sendDocument (caption, reply_markup, ...)
+        """
+        digest = await content_hash(content)
+        file_id = await self._cached_file_id(digest)
+        if file_id is not None:
+            try:
+                return await self.bot.send_document(chat_id, file_id, **kwargs)
+            except TelegramBadRequest as e:
+                # остальные ошибки (чат не найден, подпись и т.п.) к file_id не относятся
+                if not is_invalid_file_id(e):
+                    raise
+                # file_id мог стать недействительным (например, сменился бот)
+                logger.warn(f"file_id документа {filename} не принят, загружаю заново: {e}")
+                await TelegramFile.objects.bulk_delete({"content_hash": digest})
+        if isinstance(content, bytes):
+            document = BufferedInputFile(content, filename=filename)
+        else:
+            document = FSInputFile(content, filename=filename)
+        message = await self.bot.send_document(chat_id, document, **kwargs)
+        await self._remember(digest, message.document.file_id, filename)
+        return message
+
+    async def _cached_file_id(self, digest: str) -> Optional[str]:
+        record = await TelegramFile.objects.get_by_field("content_hash", digest)
+        return record.file_id if record is not None else None
+
+    async def _remember(self, digest: str, file_id: str, filename: str):
+        """Сохранение file_id (параллельная загрузка того же файла не мешает)"""
+        session = get_session(read_only=False)
+        stmt = insert(TelegramFile).values(
+            content_hash=digest,
+            file_id=file_id,
+            file_name=filename
+        ).on_conflict_do_nothing(index_elements=[TelegramFile.content_hash])
+        await session.execute(stmt)
+        await TelegramFile.objects.notify_changed(session)
+        await save_changes(session)
+
+
+document_sender = DocumentSender()
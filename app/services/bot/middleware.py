@@ -0,0 +1,61 @@
+import os
+import sys
+from typing import Any, Awaitable, Callable, Dict
+from aiogram import BaseMiddleware, Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware, NextRequestMiddlewareType
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.methods.base import Response, TelegramType
+from aiogram.types import Update
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cors.metrics import registry
+
+
+telegram_updates = registry.counter(
+    "telegram_updates_total",
+    "Обработанные обновления вебхука по типу",
+    ("type",)
+)
+
+telegram_requests = registry.counter(
+    "telegram_requests_total",
+    "Запросы к Bot API по методу и результату (ok, error, retry_after)",
+    ("method", "result")
+)
+
+
+class UpdateMetricsMiddleware(BaseMiddleware):
+    """Счетчик обновлений по типу (message, callback_query, ...)"""
+
+    async def __call__(
+        self,
+        handler: Callable[[Update, Dict[str, Any]], Awaitable[Any]],
+        event: Update,
+        data: Dict[str, Any]
+    ) -> Any:
+        telegram_updates.inc(event.event_type)
+        return await handler(event, data)
+
+
+class RequestMetricsMiddleware(BaseRequestMiddleware):
+    """Счетчик запросов к Bot API: успешные, ошибки и 429"""
+
+    async def __call__(
+        self,
+        make_request: NextRequestMiddlewareType[TelegramType],
+        bot: Bot,
+        method: TelegramMethod[TelegramType],
+    ) -> Response[TelegramType]:
+        name = type(method).__name__
+        try:
+            response = await make_request(bot, method)
+        except TelegramRetryAfter:
+            telegram_requests.inc(name, "retry_after")
+            raise
+        except Exception:
+            telegram_requests.inc(name, "error")
+            raise
+        telegram_requests.inc(name, "ok")
+        return response
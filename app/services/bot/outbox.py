@@ -0,0 +1,211 @@
+import os
+import sys
+import asyncio
+from datetime import timedelta
+from typing import Any, List, Optional
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.types import InlineKeyboardMarkup
+from sqlalchemy import delete, func, select, update
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cors.settings import settings
+from database.config import async_session
+from database.context import get_session, lazy_session, on_commit
+from database.models.outbox import NotificationOutbox
+from bot.client import dispatcher
+from bot.dispatcher import MessageDispatcher
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Ошибки, после которых повтор бесполезен (бот заблокирован, неверный chat_id)
+PERMANENT_ERRORS = (TelegramForbiddenError, TelegramBadRequest)
+
+
+async def enqueue_notification(chat_id, text: str, reply_markup: Optional[InlineKeyboardMarkup] = None) -> NotificationOutbox:
+    """
+    Запись уведомления в outbox в текущей транзакции
+
+    Уведомление уйдет только если транзакция закоммитится, воркер
+    будится сразу после коммита
+    """
+    notification = await NotificationOutbox.objects.create(
+        chat_id=str(chat_id),
+        text=text,
+        reply_markup=reply_markup.model_dump(exclude_none=True) if reply_markup is not None else None
+    )
+    on_commit(get_session(read_only=False), outbox_worker.wake, key="outbox_wake")
+    return notification
+
+
+class OutboxWorker:
+    """
+    Отправка уведомлений из notification_outbox
+
+    Строки захватываются пачками через SELECT ... FOR UPDATE SKIP LOCKED и
+    откладываются на время отправки, поэтому несколько процессов не отправляют
+    одно и то же, а блокировки не держатся во время запросов к Telegram.
+    Отправленные строки удаляются, неудачные откладываются с экспоненциальной
+    задержкой (at-least-once)
+    """
+
+    def __init__(self,
+                 message_dispatcher: MessageDispatcher,
+                 session_factory = async_session,
+                 batch_size: int = 100,
+                 poll_interval: float = 5,
+                 max_attempts: int = 10,
+                 base_delay: float = 5,
+                 max_delay: float = 3600,
+                 lease: float = 300):
+        """
+        Args:
+            message_dispatcher: Очередь отправки в Bot API
+            session_factory: Фабрика сессий основной базы
+            batch_size: Строк за одну транзакцию
+            poll_interval: Интервал опроса таблицы без пробуждений, с
+            max_attempts: Попыток до отказа от уведомления
+            base_delay: Задержка после первой ошибки, с (удваивается)
+            max_delay: Максимальная задержка между попытками, с
+            lease: На сколько откладываются захваченные строки на время отправки, с
+        """
+        self.dispatcher = message_dispatcher
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.lease = lease
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Запуск воркера"""
+        if self._task is not None:
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+        logger.info("Outbox уведомлений запущен")
+
+    async def stop(self):
+        """Остановка воркера (неотправленное остается в таблице)"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+    async def wake(self):
+        """Разбудить воркер (новые записи закоммичены)"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def process_batch(self) -> int:
+        """
+        Отправка одной пачки, возвращает количество обработанных строк
+
+        Транзакции короткие: строки захватываются (attempts + 1, next_attempt_at
+        отодвигается на lease) и коммитятся до отправки, результат записывается
+        второй транзакцией. Строки процесса, упавшего во время отправки,
+        вернутся в работу после истечения lease
+        """
+        rows = await self._claim()
+        if not rows:
+            return 0
+        futures = [await self._submit(row) for row in rows]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        await self._save_results(rows, results)
+        return len(rows)
+
+    async def _claim(self) -> List[NotificationOutbox]:
+        """Захват пачки строк через FOR UPDATE SKIP LOCKED"""
+        async with lazy_session(self.session_factory):
+            session = get_session(read_only=False)
+            ready = (
+                select(NotificationOutbox.id)
+                .where(NotificationOutbox.next_attempt_at <= func.now())
+                .order_by(NotificationOutbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            stmt = (
+                update(NotificationOutbox)
+                .where(NotificationOutbox.id.in_(ready))
+                .values(
+                    attempts=NotificationOutbox.attempts + 1,
+                    next_attempt_at=func.now() + timedelta(seconds=self.lease)
+                )
+                .returning(NotificationOutbox)
+                .execution_options(synchronize_session=False)
+            )
+            rows = list(await session.scalars(stmt))
+        rows.sort(key=lambda row: row.id)
+        return rows
+
+    async def _save_results(self, rows: List[NotificationOutbox], results: List[Any]):
+        """Удаление обработанных строк и перенос неудачных"""
+        async with lazy_session(self.session_factory):
+            session = get_session(read_only=False)
+            done = []
+            for row, result in zip(rows, results):
+                delay = self.retry_delay(row, result)
+                if delay is None:
+                    done.append(row.id)
+                    continue
+                await session.execute(
+                    update(NotificationOutbox)
+                    .where(NotificationOutbox.id == row.id)
+                    .values(last_error=str(result), next_attempt_at=func.now() + timedelta(seconds=delay))
+                    .execution_options(synchronize_session=False)
+                )
+            if done:
+                await session.execute(
+                    delete(NotificationOutbox)
+                    .where(NotificationOutbox.id.in_(done))
+                    .execution_options(synchronize_session=False)
+                )
+
+    def retry_delay(self, row: NotificationOutbox, result: Any) -> Optional[float]:
+        """Задержка до следующей попытки, None - строку удалить (отправлено или отказ)"""
+        if not isinstance(result, BaseException):
+            return None
+        if isinstance(result, PERMANENT_ERRORS):
+            logger.warn(f"Уведомление {row.id} в {row.chat_id} отброшено: {result}")
+            return None
+        if row.attempts >= self.max_attempts:
+            logger.error(f"Уведомление {row.id} в {row.chat_id} не отправлено за {self.max_attempts} попыток: {result}")
+            return None
+        return min(self.base_delay * 2 ** (row.attempts - 1), self.max_delay)
+
+    async def _submit(self, row: NotificationOutbox) -> asyncio.Future:
+        reply_markup = InlineKeyboardMarkup.model_validate(row.reply_markup) if row.reply_markup else None
+        return await self.dispatcher.send_message(row.chat_id, row.text, reply_markup=reply_markup)
+
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.process_batch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка обработки outbox: {e}")
+                processed = 0
+            if processed < self.batch_size:
+                await self._wait()
+
+    async def _wait(self):
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+
+outbox_worker = OutboxWorker(
+    dispatcher,
+    batch_size=settings.OUTBOX_BATCH_SIZE,
+    poll_interval=settings.OUTBOX_POLL_INTERVAL,
+    max_attempts=settings.OUTBOX_MAX_ATTEMPTS
+)
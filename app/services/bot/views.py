@@ -2,8 +2,9 @@ import os
 import sys
 from typing import Any, Callable, Dict, Awaitable, Optional
 from aiogram import F, BaseMiddleware, Router
-from aiogram.types import  CallbackQuery, Update, Message, InlineKeyboardMarkup, InlineKeyboardButton, BufferedInputFile
-from aiogram.filters import Command
+from aiogram.types import  CallbackQuery, Update, Message, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.filters import Command, CommandObject
+from fastapi import HTTPException
 
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -11,8 +12,14 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.services.database.models.applications import Applications, Users
 from app.services.bot.serializer import UserModelSerializer
-from app.utils.excel_conventor import convert_to_excel, convert_to_excel_buffer
+from app.services.user.export import UserExporter, export_cache
+from app.services.bot.files import document_sender
 from app.services.application.deps import get_application_service
+from app.services.broadcast.service import broadcast_service
+from app.services.bot.admins import admin_roster
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
 
 admin_router = Router()
 
@@ -25,32 +32,48 @@ class AdminMiddleware(BaseMiddleware):
         data: Dict[str, Any]
     ) -> Any:
         user_id = event.from_user.id
-        root_user: Optional[Users] = await Users.objects.get_by_field(field_name="telegram_id", value=str(user_id))
-        if not root_user or not root_user.is_active or not root_user.is_admin:
+        if not await admin_roster.is_admin(user_id):
             if isinstance(event, Message): await event.answer("❌ У вас нет прав администратора")
-            elif isinstance(event, CallbackQuery): await event.message.answer("❌ У вас нет прав администратора", show_alert=True)
+            elif isinstance(event, CallbackQuery): await event.answer("❌ У вас нет прав администратора", show_alert=True)
             return  
         return await handler(event, data)
     
 
 admin_router.message.middleware(AdminMiddleware())
-#admin_router.callback_query.middleware(AdminMiddleware())
+admin_router.callback_query.middleware(AdminMiddleware())
 
 
 @admin_router.message(Command('excel'))
 async def admin_panel(message: Message):
-    users = await Users.objects.filter()
-    user_serializer = UserModelSerializer()
-    serialize_user = user_serializer.dump(users, many=True)
-    excel_buffer = convert_to_excel_buffer(
-        colums_name=list(user_serializer.fields.keys()), 
-        data=[list(user.values()) for user in serialize_user]
-    )
-    document = BufferedInputFile(
-        excel_buffer.getvalue(), 
-        filename="users_data.xlsx"
+    exporter = UserExporter(Users, list(UserModelSerializer().fields.keys()))
+    path, _ = await export_cache.get(exporter, "xlsx")
+    await document_sender.send(message.chat.id, path, filename="users_data.xlsx")
+
+
+@admin_router.message(Command('broadcast'))
+async def broadcast_handler(message: Message, command: CommandObject):
+    """Рассылка всем участникам: /broadcast <текст>"""
+    if not command.args:
+        await message.answer("Использование: /broadcast <текст>")
+        return
+    broadcast = await broadcast_service.create(command.args, created_by=message.from_user.username)
+    await message.answer(f"Рассылка {broadcast.id} запущена\nПрогресс: /broadcast_status {broadcast.id}")
+
+
+@admin_router.message(Command('broadcast_status'))
+async def broadcast_status_handler(message: Message, command: CommandObject):
+    """Прогресс рассылки: /broadcast_status <id>"""
+    if not command.args or not command.args.strip().isdigit():
+        await message.answer("Использование: /broadcast_status <id>")
+        return
+    progress = await broadcast_service.progress(int(command.args))
+    if progress is None:
+        await message.answer("Рассылка не найдена")
+        return
+    await message.answer(
+        f"Рассылка {progress['id']} : {progress['status']}\n"
+        f"Отправлено : {progress['sent']}\nОшибок : {progress['failed']}\nЗаблокировали бота : {progress['blocked']}"
     )
-    await message.answer_document(document)
 
 
 @admin_router.message(Command('admin'))
@@ -65,15 +88,17 @@ async def admin_panel(message : Message):
 @admin_router.callback_query(F.data.startswith('accept_'))
 async def application_accept_handler(callback : CallbackQuery, application_id : Optional[int] = None):
     """Принимаем заявку от пользователя"""
-    print("Принимаем заявку от пользователя")
     try:
-        print(callback.data.split("_"))
         application_id = int(callback.data.split("_")[1])
-        print("ID", application_id)
         application_service = await get_application_service()
-        telegram_id = await application_service.accept_application(application_id)
+        await application_service.accept_application(application_id)
+        await callback.answer("✅ Заявка принята")
+    except HTTPException as e:
+        await callback.answer(e.detail, show_alert=True)
     except Exception as e:
-        print("Ошибка в приеме заявки", e)
+        # пробрасываем дальше, чтобы сессия апдейта откатилась
+        logger.error(f"Ошибка в приеме заявки {application_id}: {e}")
+        raise
 
 @admin_router.callback_query(F.data.startswith('reject_'))
 async def application_reject_handler(callback : CallbackQuery, application_id : Optional[int] = None):
@@ -81,6 +106,10 @@ async def application_reject_handler(callback : CallbackQuery, application_id :
     try:
         application_id = int(callback.data.split("_")[1])
         application_service = await get_application_service()
-        telegram_id = await application_service.reject_application(application_id)
+        await application_service.reject_application(application_id)
+        await callback.answer("❌ Заявка отклонена")
+    except HTTPException as e:
+        await callback.answer(e.detail, show_alert=True)
     except Exception as e:
-         print("Ошибка в приеме заявки", e)
\ No newline at end of file
+        logger.error(f"Ошибка в отклонении заявки {application_id}: {e}")
+        raise
\ No newline at end of file
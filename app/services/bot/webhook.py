@@ -0,0 +1,104 @@
+import os
+import sys
+import hmac
+from aiogram import Bot
+from aiogram.types import Update
+from pydantic import ValidationError
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.workers import UpdateWorkerPool
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+SECRET_HEADER = b"x-telegram-bot-api-secret-token"
+
+
+class TelegramWebhookMiddleware:
+    """
+    Pure ASGI прием вебхука Telegram
+
+    Подключается последним (внешним) middleware: запрос на path не проходит
+    через остальные middleware и роутинг FastAPI. Секрет проверяется до чтения
+    тела, тело валидируется в Update за один проход и ставится в UpdateWorkerPool
+    """
+
+    def __init__(self,
+                 app: ASGIApp,
+                 path: str,
+                 secret_token: str,
+                 pool: UpdateWorkerPool,
+                 bot: Bot,
+                 max_body_size: int = 1024 * 1024):
+        """
+        Args:
+            path: Путь вебхука
+            secret_token: Ожидаемый X-Telegram-Bot-Api-Secret-Token
+            pool: Пул обработки обновлений
+            bot: Бот, к которому привязываются объекты Update
+            max_body_size: Максимальный размер тела в байтах
+        """
+        self.app = app
+        self.path = path
+        self.secret_token = secret_token.encode()
+        self.pool = pool
+        self.bot = bot
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            await self.app(scope, receive, send)
+            return
+        if scope["method"] != "POST":
+            await self._respond(send, 405)
+            return
+        secret = b""
+        for name, value in scope["headers"]:
+            if name == SECRET_HEADER:
+                secret = value
+                break
+        if not hmac.compare_digest(secret, self.secret_token):
+            logger.warn(f"Неверный secret token вебхука c {scope['client'][0] if scope.get('client') else '-'}")
+            await self._respond(send, 401)
+            return
+        body = await self._read_body(receive)
+        if body is None:
+            await self._respond(send, 413)
+            return
+        try:
+            update = Update.model_validate_json(body, context={"bot": self.bot})
+        except ValidationError as e:
+            logger.warn(f"Некорректное обновление вебхука: {e.error_count()} ошибок")
+            await self._respond(send, 400)
+            return
+        if not self.pool.submit(update):
+            await self._respond(send, 503)
+            return
+        await self._respond(send, 200)
+
+    async def _read_body(self, receive: Receive):
+        """Тело запроса или None, если оно больше max_body_size"""
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return b"".join(chunks)
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > self.max_body_size:
+                return None
+            chunks.append(chunk)
+            if not message.get("more_body", False):
+                return b"".join(chunks)
+
+    @staticmethod
+    async def _respond(send: Send, status: int):
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-length", b"0")],
+        })
+        await send({"type": "http.response.body", "body": b""})
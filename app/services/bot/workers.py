@@ -0,0 +1,177 @@
+import os
+import sys
+import time
+import asyncio
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, List, Optional
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.config import async_session
+from database.context import lazy_session
+from app.cors.metrics import registry
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+telegram_update_queue_depth = registry.gauge(
+    "telegram_update_queue_depth",
+    "Обновления вебхука, ожидающие обработки"
+)
+
+telegram_updates_dropped = registry.counter(
+    "telegram_updates_dropped_total",
+    "Отброшенные обновления вебхука (duplicate, queue_full)",
+    ("reason",)
+)
+
+
+def update_chat_id(update: Update) -> Optional[int]:
+    """chat_id обновления (для callback_query - чат сообщения или пользователь)"""
+    event = update.event
+    chat = getattr(event, "chat", None)
+    if chat is None:
+        message = getattr(event, "message", None)
+        chat = getattr(message, "chat", None)
+    if chat is not None:
+        return chat.id
+    user = getattr(event, "from_user", None)
+    return user.id if user is not None else None
+
+
+class UpdateWorkerPool:
+    """
+    Обработка обновлений вебхука в фоне
+
+    Вебхук только ставит обновление в очередь и сразу отвечает Telegram.
+    У каждого чата своя FIFO очередь, общие воркеры берут из очереди готовых
+    чаты, которые сейчас никто не обрабатывает. Обновления одного чата идут
+    строго по порядку, а медленный обработчик (например /excel) занимает
+    один воркер и не задерживает другие чаты.
+    Повторно присланные update_id в пределах окна отбрасываются
+    """
+
+    def __init__(self,
+                 dp: Dispatcher,
+                 bot: Bot,
+                 workers: int = 8,
+                 max_queue: int = 1000,
+                 dedup_window: float = 300,
+                 session_factory = async_session):
+        """
+        Args:
+            dp: Диспетчер aiogram
+            bot: Бот
+            workers: Количество воркеров
+            max_queue: Общий размер очередей, при переполнении submit отказывает
+            dedup_window: Сколько секунд помнить обработанные update_id
+            session_factory: Фабрика сессий для обработчиков
+        """
+        self.dp = dp
+        self.bot = bot
+        self.workers = workers
+        self.max_queue = max_queue
+        self.dedup_window = dedup_window
+        self.session_factory = session_factory
+        # chat_id -> обновления чата; чат есть в словаре, пока он в очереди готовых или в работе
+        self._chats: Dict[Any, Deque[Update]] = {}
+        self._ready: Optional[asyncio.Queue] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._queued = 0
+        self._tasks: List[asyncio.Task] = []
+        # update_id -> время получения
+        self._seen: "OrderedDict[int, float]" = OrderedDict()
+        telegram_update_queue_depth.set_function(lambda: [((), self.queue_depth)])
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def queue_depth(self) -> int:
+        """Количество обновлений в очередях"""
+        return self._queued
+
+    async def start(self):
+        """Запуск воркеров"""
+        if self.running:
+            return
+        self._ready = asyncio.Queue()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Обработка обновлений запущена: {self.workers} воркеров")
+
+    async def stop(self, timeout: float = 10):
+        """Остановка: дожидаемся обработки очередей не дольше timeout секунд"""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+        except asyncio.TimeoutError:
+            logger.warn(f"Обработка обновлений остановлена, в очереди: {self.queue_depth}")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._chats.clear()
+        self._queued = 0
+
+    def submit(self, update: Update) -> bool:
+        """
+        Постановка обновления в очередь без ожидания
+
+        Возвращает False, если очередь переполнена (Telegram повторит запрос).
+        Дубликаты принимаются, но не обрабатываются
+        """
+        if not self.running:
+            raise RuntimeError("Пул обработки обновлений не запущен")
+        now = time.monotonic()
+        self._forget(now)
+        if update.update_id in self._seen:
+            telegram_updates_dropped.inc("duplicate")
+            return True
+        if self._queued >= self.max_queue:
+            telegram_updates_dropped.inc("queue_full")
+            logger.warn(f"Очередь обновлений переполнена, update {update.update_id} отклонен")
+            return False
+        chat_id = update_chat_id(update)
+        updates = self._chats.get(chat_id)
+        if updates is None:
+            updates = self._chats[chat_id] = deque()
+            self._ready.put_nowait(chat_id)
+        updates.append(update)
+        self._queued += 1
+        self._idle.clear()
+        self._seen[update.update_id] = now
+        return True
+
+    async def _worker(self):
+        while True:
+            chat_id = await self._ready.get()
+            updates = self._chats[chat_id]
+            update = updates.popleft()
+            self._queued -= 1
+            try:
+                async with lazy_session(self.session_factory):
+                    await self.dp.feed_update(self.bot, update)
+            except Exception as e:
+                logger.error(f"Ошибка обработки update {update.update_id}: {e}")
+            finally:
+                # следующий апдейт чата - только после текущего, в конец очереди готовых
+                if updates:
+                    self._ready.put_nowait(chat_id)
+                else:
+                    del self._chats[chat_id]
+                    if not self._chats:
+                        self._idle.set()
+
+    def _forget(self, now: float):
+        """Удаление update_id старше окна"""
+        while self._seen:
+            update_id, seen_at = next(iter(self._seen.items()))
+            if now - seen_at < self.dedup_window:
+                break
+            del self._seen[update_id]
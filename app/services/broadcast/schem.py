@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class BroadcastRequest(BaseModel):
+    """Модель запроса для рассылки"""
+    text : str = Field(min_length=1, max_length=4096)
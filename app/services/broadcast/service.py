@@ -0,0 +1,201 @@
+import os
+import sys
+import asyncio
+from typing import Dict, List, Optional, Tuple
+from aiogram.exceptions import TelegramForbiddenError
+from sqlalchemy import select, update
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.config import async_session
+from database.context import get_session, lazy_session, on_commit
+from app.services.database.models.broadcast import Broadcast
+from app.services.database.models.user import UsersLatest
+from bot.client import dispatcher
+from bot.dispatcher import MessageDispatcher
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class BroadcastService:
+    """
+    Рассылка сообщения всем участникам
+
+    Получатели читаются из users пачками по id (keyset), отправка идет через
+    MessageDispatcher на максимально допустимой скорости. После каждой пачки
+    в broadcasts сохраняются курсор и счетчики, поэтому после рестарта рассылка
+    продолжается с места остановки. Заблокировавшие бота помечаются is_bot_blocked
+    и в следующие рассылки не попадают.
+    Рассылки отправляет только процесс-лидер (activate), остальные процессы
+    только создают их, лидер подхватывает новые рассылки опросом таблицы
+    """
+
+    def __init__(self,
+                 message_dispatcher: MessageDispatcher,
+                 session_factory = async_session,
+                 batch_size: int = 200,
+                 poll_interval: float = 10):
+        self.dispatcher = message_dispatcher
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.active = False
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._poll_task: Optional[asyncio.Task] = None
+
+    async def create(self, text: str, created_by: Optional[str] = None) -> Broadcast:
+        """Создание рассылки, отправка начнется после коммита текущей сессии"""
+        broadcast = await Broadcast.objects.create(text=text, created_by=created_by)
+        broadcast_id = broadcast.id
+
+        async def start():
+            await self.start(broadcast_id)
+
+        on_commit(get_session(read_only=False), start, key=("broadcast", broadcast_id))
+        return broadcast
+
+    async def activate(self):
+        """Процесс стал лидером: продолжаем незавершенные и следим за новыми рассылками"""
+        if self.active:
+            return
+        self.active = True
+        self._poll_task = asyncio.create_task(self._poll())
+
+    async def start(self, broadcast_id: int):
+        """Запуск рассылки в фоне (только у лидера)"""
+        if not self.active:
+            return
+        task = self._tasks.get(broadcast_id)
+        if task is not None and not task.done():
+            return
+        self._tasks[broadcast_id] = asyncio.create_task(self.run(broadcast_id))
+
+    async def resume_all(self):
+        """Запуск незавершенных рассылок, которые еще не отправляются этим процессом"""
+        async with lazy_session(self.session_factory):
+            # мимо кеша запросов: рассылки создаются и в других процессах
+            result = await get_session(read_only=False).execute(
+                select(Broadcast.id, Broadcast.cursor).where(Broadcast.status == 'running').order_by(Broadcast.id)
+            )
+            broadcasts = result.all()
+        for broadcast_id, cursor in broadcasts:
+            if broadcast_id in self._tasks:
+                continue
+            logger.info(f"Продолжаю рассылку {broadcast_id} с пользователя {cursor}")
+            await self.start(broadcast_id)
+
+    async def cancel(self, broadcast_id: int) -> Optional[Broadcast]:
+        """Остановка рассылки"""
+        broadcasts = await Broadcast.objects.bulk_update({"id": broadcast_id, "status": 'running'}, {"status": 'cancelled'}, returning=True)
+        task = self._tasks.pop(broadcast_id, None)
+        if task is not None:
+            task.cancel()
+        return broadcasts[0] if broadcasts else await Broadcast.objects.get(broadcast_id)
+
+    async def stop(self):
+        """Остановка фоновых задач (рассылки остаются running и продолжатся)"""
+        self.active = False
+        tasks = list(self._tasks.values())
+        if self._poll_task is not None:
+            tasks.append(self._poll_task)
+            self._poll_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    async def progress(self, broadcast_id: int) -> Optional[dict]:
+        """Прогресс рассылки"""
+        # мимо кеша запросов: счетчики обновляет процесс-лидер
+        broadcast = await get_session(read_only=False).get(Broadcast, broadcast_id)
+        if broadcast is None:
+            return None
+        return {
+            "id": broadcast.id,
+            "status": broadcast.status,
+            "sent": broadcast.sent,
+            "failed": broadcast.failed,
+            "blocked": broadcast.blocked,
+            "cursor": broadcast.cursor,
+        }
+
+    async def run(self, broadcast_id: int):
+        """Отправка рассылки пачками до конца списка"""
+        try:
+            while True:
+                async with lazy_session(self.session_factory):
+                    broadcast = await get_session(read_only=False).get(Broadcast, broadcast_id)
+                    if broadcast is None or broadcast.status != 'running':
+                        return
+                    text, cursor = broadcast.text, broadcast.cursor
+                    recipients = await self._next_batch(cursor)
+                    if not recipients:
+                        await Broadcast.objects.bulk_update({"id": broadcast_id}, {"status": 'done'})
+                        logger.info(f"Рассылка {broadcast_id} завершена")
+                        return
+                sent, failed, blocked_ids = await self._send_batch(text, recipients)
+                async with lazy_session(self.session_factory):
+                    await self._save_batch(broadcast_id, recipients[-1][0], sent, failed, blocked_ids)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Рассылка {broadcast_id} прервана: {e}")
+        finally:
+            self._tasks.pop(broadcast_id, None)
+
+    async def _poll(self):
+        while True:
+            try:
+                await self.resume_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Ошибка поиска рассылок: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+    async def _next_batch(self, cursor: int) -> List[Tuple[int, str]]:
+        """Следующая пачка получателей (id, telegram_id) после cursor"""
+        stmt = (
+            select(UsersLatest.id, UsersLatest.telegram_id)
+            .where(UsersLatest.id > cursor, UsersLatest.is_active.is_(True), UsersLatest.is_bot_blocked.is_(False))
+            .order_by(UsersLatest.id)
+            .limit(self.batch_size)
+        )
+        result = await get_session(read_only=False).execute(stmt)
+        return [tuple(row) for row in result.all()]
+
+    async def _send_batch(self, text: str, recipients: List[Tuple[int, str]]) -> Tuple[int, int, List[int]]:
+        """Отправка пачки, возвращает (отправлено, ошибок, id заблокировавших)"""
+        futures = [await self.dispatcher.send_message(telegram_id, text) for _, telegram_id in recipients]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        sent, failed, blocked_ids = 0, 0, []
+        for (user_id, _), result in zip(recipients, results):
+            if isinstance(result, TelegramForbiddenError):
+                blocked_ids.append(user_id)
+            elif isinstance(result, BaseException):
+                failed += 1
+            else:
+                sent += 1
+        return sent, failed, blocked_ids
+
+    async def _save_batch(self, broadcast_id: int, cursor: int, sent: int, failed: int, blocked_ids: List[int]):
+        """Курсор, счетчики и отметка заблокировавших одной транзакцией"""
+        session = get_session(read_only=False)
+        if blocked_ids:
+            await session.execute(
+                update(UsersLatest).where(UsersLatest.id.in_(blocked_ids)).values(is_bot_blocked=True)
+            )
+            await UsersLatest.objects.notify_changed(session)
+        await Broadcast.objects.bulk_update(
+            {"id": broadcast_id},
+            {
+                "cursor": cursor,
+                "sent": Broadcast.sent + sent,
+                "failed": Broadcast.failed + failed,
+                "blocked": Broadcast.blocked + len(blocked_ids),
+            }
+        )
+
+
+broadcast_service = BroadcastService(dispatcher)
@@ -0,0 +1,46 @@
+import os
+import sys
+from fastapi import APIRouter, Request, Response
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services.broadcast.schem import BroadcastRequest
+from app.services.broadcast.service import broadcast_service
+from app.services.depends import handle_errors_wrraper
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+admin_broadcast_router_v2 = APIRouter(prefix="/broadcast")
+
+@handle_errors_wrraper()
+@admin_broadcast_router_v2.post('')
+async def create_broadcast(request : Request, data : BroadcastRequest):
+    """Запуск рассылки всем участникам"""
+    user = getattr(request.state, "user", None)
+    created_by = user.telegram_user_name if user else None
+    broadcast = await broadcast_service.create(data.text, created_by=created_by)
+    logger.info(f"Рассылка {broadcast.id} от {created_by}")
+    return {"details" : "ok", "broadcast_id" : broadcast.id}
+
+@handle_errors_wrraper()
+@admin_broadcast_router_v2.get('/{broadcast_id}')
+async def get_broadcast(broadcast_id : int, response : Response):
+    """Прогресс рассылки"""
+    progress = await broadcast_service.progress(broadcast_id)
+    if progress is None:
+        response.status_code = 404
+        return {"details" : "Рассылка не найдена"}
+    return {"details" : "ok", "broadcast" : progress}
+
+@handle_errors_wrraper()
+@admin_broadcast_router_v2.post('/{broadcast_id}/cancel')
+async def cancel_broadcast(broadcast_id : int, response : Response):
+    """Остановка рассылки"""
+    progress = await broadcast_service.progress(broadcast_id)
+    if progress is None:
+        response.status_code = 404
+        return {"details" : "Рассылка не найдена"}
+    await broadcast_service.cancel(broadcast_id)
+    return {"details" : "ok"}
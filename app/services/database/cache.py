@@ -0,0 +1,186 @@
+import hashlib
+import pickle
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+class CacheBackend:
+    """Базовый интерфейс хранилища кеша"""
+
+    async def get(self, key: str) -> Optional[Any]:
+        """Значение по ключу или None"""
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float):
+        """Сохранение значения на ttl секунд"""
+        raise NotImplementedError
+
+    async def incr(self, key: str) -> int:
+        """Атомарное увеличение счетчика (без TTL)"""
+        raise NotImplementedError
+
+    async def get_int(self, key: str) -> int:
+        """Значение счетчика, 0 если его нет"""
+        raise NotImplementedError
+
+
+class MemoryCacheBackend(CacheBackend):
+    """In-memory LRU хранилище с TTL (в рамках одного процесса)"""
+
+    def __init__(self, maxsize: int = 10000):
+        self.maxsize = maxsize
+        # key -> (expires_at, value)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counters: Dict[str, int] = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    async def incr(self, key: str) -> int:
+        value = self._counters.get(key, 0) + 1
+        self._counters[key] = value
+        return value
+
+    async def get_int(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+
+class RedisCacheBackend(CacheBackend):
+    """Хранилище в Redis (или совместимом сервере), общее для всех воркеров"""
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("Для RedisCacheBackend нужен пакет redis (pip install redis)") from e
+        self._client = aioredis.from_url(url)
+
+    async def get(self, key: str) -> Optional[Any]:
+        data = await self._client.get(key)
+        if data is None:
+            return None
+        return pickle.loads(data)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        await self._client.set(key, pickle.dumps(value), px=int(ttl * 1000))
+
+    async def incr(self, key: str) -> int:
+        return await self._client.incr(key)
+
+    async def get_int(self, key: str) -> int:
+        value = await self._client.get(key)
+        return int(value) if value is not None else 0
+
+
+class QueryCache:
+    """
+    Кеш результатов запросов BaseManager
+
+    Ключи содержат версию таблицы: запись через менеджер увеличивает версию,
+    и все закешированные результаты этой таблицы сразу становятся недоступны
+    """
+
+    def __init__(self,
+                 backend: CacheBackend,
+                 default_ttl: float = 60,
+                 ttl: Optional[Dict[str, float]] = None,
+                 prefix: str = "qc"):
+        """
+        Args:
+            backend: Хранилище
+            default_ttl: TTL по умолчанию в секундах
+            ttl: TTL по имени таблицы, 0 отключает кеш для таблицы
+            prefix: Префикс ключей
+        """
+        self.backend = backend
+        self.default_ttl = default_ttl
+        self.ttl = ttl or {}
+        self.prefix = prefix
+        self._hits: Dict[str, int] = {}
+        self._misses: Dict[str, int] = {}
+
+    def ttl_for(self, model) -> float:
+        """TTL для модели"""
+        return self.ttl.get(model.__tablename__, self.default_ttl)
+
+    def enabled_for(self, model) -> bool:
+        """Включен ли кеш для модели"""
+        return self.ttl_for(model) > 0
+
+    async def make_key(self, model, op: str, params: Any) -> str:
+        """Ключ с текущей версией таблицы"""
+        table = model.__tablename__
+        version = await self.backend.get_int(self._version_key(table))
+        digest = hashlib.sha1(repr(params).encode()).hexdigest()
+        return f"{self.prefix}:{table}:{version}:{op}:{digest}"
+
+    async def get(self, model, key: str) -> Tuple[bool, Any]:
+        """Возвращает (есть ли в кеше, значение)"""
+        table = model.__tablename__
+        entry = await self.backend.get(key)
+        if entry is None:
+            self._misses[table] = self._misses.get(table, 0) + 1
+            return False, None
+        self._hits[table] = self._hits.get(table, 0) + 1
+        return True, entry[0]
+
+    async def set(self, model, key: str, value: Any):
+        """Сохранение значения (None тоже кешируется)"""
+        await self.backend.set(key, (value,), self.ttl_for(model))
+
+    async def invalidate(self, model):
+        """Сброс всех результатов таблицы увеличением версии"""
+        await self.backend.incr(self._version_key(model.__tablename__))
+
+    def stats(self) -> Dict[str, dict]:
+        """Статистика попаданий по таблицам"""
+        stats = {}
+        for table in set(self._hits) | set(self._misses):
+            hits = self._hits.get(table, 0)
+            misses = self._misses.get(table, 0)
+            stats[table] = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": hits / (hits + misses),
+            }
+        return stats
+
+    def _version_key(self, table: str) -> str:
+        return f"{self.prefix}:{table}:version"
+
+
+def create_query_cache(backend: str,
+                       default_ttl: float = 60,
+                       ttl: Optional[Dict[str, float]] = None,
+                       maxsize: int = 10000,
+                       redis_url: Optional[str] = None) -> Optional[QueryCache]:
+    """
+    Создание кеша по названию хранилища
+
+    Args:
+        backend: none, memory или redis
+    """
+    if backend == "none":
+        return None
+    if backend == "memory":
+        return QueryCache(MemoryCacheBackend(maxsize), default_ttl, ttl)
+    if backend == "redis":
+        if not redis_url:
+            raise ValueError("Для кеша в redis нужен REDIS_URL")
+        return QueryCache(RedisCacheBackend(redis_url), default_ttl, ttl)
+    raise ValueError(f"Неизвестное хранилище кеша: {backend}")
@@ -8,6 +8,10 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from cors.settings import settings
 from database.models.base import Base
 from database.models.admin import Admins
+from database.manager import BaseManager
+from database.cache import create_query_cache
+from database.instrumentation import instrument_engine
+from app.cors.metrics import track_pool
 from app.cors.logger.logger import get_logger
 
 
@@ -17,6 +21,25 @@ logger = get_logger(__name__)
 
 engine = create_async_engine(settings.AsyncDataBaseUrl, echo = False, pool_size=10, max_overflow=20, pool_pre_ping=True)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
+instrument_engine(engine)
+track_pool("primary", engine)
+
+# Реплика для чтения, без настройки чтение идет с основной базы
+replica_engine = None
+async_replica_session = None
+if settings.AsyncReplicaDataBaseUrl:
+    replica_engine = create_async_engine(settings.AsyncReplicaDataBaseUrl, echo = False, pool_size=10, max_overflow=20, pool_pre_ping=True)
+    async_replica_session = async_sessionmaker(replica_engine, expire_on_commit=False)
+    instrument_engine(replica_engine)
+    track_pool("replica", replica_engine)
+
+BaseManager.configure_cache(create_query_cache(
+    settings.QUERY_CACHE_BACKEND,
+    default_ttl=settings.QUERY_CACHE_TTL,
+    ttl=settings.QUERY_CACHE_MODEL_TTL,
+    maxsize=settings.QUERY_CACHE_SIZE,
+    redis_url=settings.REDIS_URL
+))
 
 async def create_root(instanse : Base = Admins):
     logger.info("СОЗДАЕМ АДМИНА...")
@@ -52,6 +75,9 @@ async def create_all_tables():
         from database.models.admin import Admins
         from database.models.applications import ApplicationsLatest
         from database.models.user import UsersLatest
+        from database.models.broadcast import Broadcast
+        from database.models.outbox import NotificationOutbox
+        from database.models.telegram_file import TelegramFile
         logger.info(f'после импорта {Base.metadata.tables.keys()}')
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.create_all)
@@ -66,6 +92,9 @@ async def drop_all_tables():
     try:
         from database.models.applications import Applications, Users, ApplicationsLatest
         from database.models.user import UsersLatest
+        from database.models.broadcast import Broadcast
+        from database.models.outbox import NotificationOutbox
+        from database.models.telegram_file import TelegramFile
         from database.models.admin import Admins
         async with engine.begin() as conn:
             await conn.run_sync(Base.metadata.drop_all)
@@ -1,20 +1,149 @@
+from contextlib import asynccontextmanager
 from contextvars import ContextVar
-from sqlalchemy.ext.asyncio import AsyncSession
-from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.sql.elements import TextClause
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from typing import Any, Awaitable, Callable, Optional, Union
 
 
-_db_session: ContextVar[Optional[AsyncSession]] = ContextVar('_db_session', default=None)
+SAFE_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
 
+# Первое слово text() запросов, которые ничего не пишут
+READ_ONLY_SQL = frozenset({"SELECT", "SHOW", "EXPLAIN"})
 
-def get_session() -> AsyncSession:
-    """Получение текущей сессии из контекста"""
+
+class LazySession:
+    """
+    Ленивая сессия запроса
+
+    Сессия (и соединение из пула) создается только при первом вызове
+    get_session(), коммит выполняется только если что-то было записано.
+    В режиме unit of work записи менеджеров только делают flush, а коммит
+    один на весь запрос.
+    Чтение с read_only уходит на реплику, пока в запросе не была открыта
+    сессия основной базы (read-your-writes)
+    """
+
+    def __init__(self,
+                 session_factory: async_sessionmaker,
+                 replica_session_factory: Optional[async_sessionmaker] = None,
+                 read_only: bool = False,
+                 unit_of_work: bool = True):
+        """
+        Args:
+            session_factory: Фабрика сессий основной базы
+            replica_session_factory: Фабрика сессий реплики
+            read_only: Режим по умолчанию для get_session() без аргумента
+            unit_of_work: Записи делают flush, коммит при выходе из блока
+        """
+        self._session_factory = session_factory
+        self._replica_session_factory = replica_session_factory
+        self.read_only = read_only
+        self.unit_of_work = unit_of_work
+        self._session: Optional[AsyncSession] = None
+        self._replica_session: Optional[AsyncSession] = None
+
+    @property
+    def started(self) -> bool:
+        """Была ли сессия открыта"""
+        return self._session is not None
+
+    @property
+    def has_writes(self) -> bool:
+        """Были ли изменения в текущей транзакции"""
+        session = self._session
+        if session is None:
+            return False
+        return bool(session.info.get("has_writes") or session.new or session.dirty or session.deleted)
+
+    def get(self, read_only: Optional[bool] = None) -> AsyncSession:
+        """Получение (создание при первом обращении) сессии"""
+        if read_only is None:
+            read_only = self.read_only
+        if read_only and self._session is None and self._replica_session_factory is not None:
+            if self._replica_session is None:
+                self._replica_session = self._replica_session_factory()
+            return self._replica_session
+        if self._session is None:
+            self._session = self._session_factory()
+        return self._session
+
+    async def commit(self):
+        """Коммит если были изменения"""
+        if self.has_writes:
+            await self._session.commit()
+            await run_commit_hooks(self._session)
+
+    async def rollback(self):
+        """Откат если сессия была открыта"""
+        if self._session is not None:
+            await self._session.rollback()
+
+    async def close(self):
+        """Закрытие сессий и возврат соединений в пул"""
+        if self._replica_session is not None:
+            await self._replica_session.close()
+            self._replica_session = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+_db_session: ContextVar[Optional[Union[AsyncSession, LazySession]]] = ContextVar('_db_session', default=None)
+
+
+def get_session(read_only: Optional[bool] = None) -> AsyncSession:
+    """
+    Получение текущей сессии из контекста
+
+    Args:
+        read_only: True - чтение с реплики, False - основная база,
+                   None - по методу HTTP запроса
+    """
     session = _db_session.get()
     if session is None:
         raise RuntimeError("Сессия не установлена в текущем контексте")
+    if isinstance(session, LazySession):
+        return session.get(read_only)
     return session
 
 
-def set_session(session: AsyncSession):
+def in_unit_of_work() -> bool:
+    """Работает ли текущий контекст в режиме unit of work"""
+    session = _db_session.get()
+    return isinstance(session, LazySession) and session.unit_of_work
+
+
+async def save_changes(session: AsyncSession):
+    """Фиксация изменений: flush внутри unit of work, иначе commit"""
+    if in_unit_of_work():
+        await session.flush()
+    else:
+        await session.commit()
+        await run_commit_hooks(session)
+
+
+def on_commit(session: AsyncSession, callback: Callable[[], Awaitable[Any]], key: Any = None):
+    """
+    Выполнить async callback после успешного коммита сессии
+
+    Повторная регистрация с тем же key заменяет callback. При откате
+    зарегистрированные callback отбрасываются
+    """
+    hooks = session.info.setdefault("on_commit", {})
+    hooks[key if key is not None else id(callback)] = callback
+
+
+async def run_commit_hooks(session: AsyncSession):
+    """Выполнение callback, зарегистрированных через on_commit"""
+    hooks = session.info.pop("on_commit", None)
+    if hooks:
+        for callback in hooks.values():
+            await callback()
+
+
+def set_session(session: Union[AsyncSession, LazySession]):
     """Установка сессии в контекст"""
     return _db_session.set(session)
 
@@ -23,3 +152,63 @@ def reset_session(token):
     """Сброс сессии из контекста"""
     _db_session.reset(token)
 
+
+@asynccontextmanager
+async def lazy_session(session_factory: async_sessionmaker,
+                       replica_session_factory: Optional[async_sessionmaker] = None,
+                       read_only: bool = False,
+                       unit_of_work: bool = True):
+    """Привязка ленивой сессии к контексту на время блока"""
+    session = LazySession(session_factory, replica_session_factory, read_only, unit_of_work)
+    token = set_session(session)
+    try:
+        yield session
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+    finally:
+        reset_session(token)
+        await session.close()
+
+
+@event.listens_for(Session, "after_flush")
+def _mark_flush_writes(session, flush_context):
+    """Отмечаем сессию с записанными изменениями"""
+    session.info["has_writes"] = True
+
+
+def mark_dirty(session: AsyncSession):
+    """
+    Отметить сессию как изменившую данные (коммит при выходе из lazy_session)
+
+    Для записей мимо session.execute, например через session.connection()
+    """
+    session.info["has_writes"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_statement_writes(orm_execute_state):
+    """Отмечаем сессию при любом запросе, кроме чтения (ORM, Core и text())"""
+    if _is_write(orm_execute_state.statement):
+        orm_execute_state.session.info["has_writes"] = True
+
+
+def _is_write(statement) -> bool:
+    if isinstance(statement, TextClause):
+        words = statement.text.split(None, 1)
+        return not words or words[0].upper() not in READ_ONLY_SQL
+    return not statement.is_select
+
+
+@event.listens_for(Session, "after_commit")
+def _reset_writes(session):
+    """Сбрасываем отметку после завершения транзакции"""
+    session.info.pop("has_writes", None)
+
+
+@event.listens_for(Session, "after_rollback")
+def _reset_after_rollback(session):
+    """После отката нет ни изменений, ни callback на коммит"""
+    session.info.pop("has_writes", None)
+    session.info.pop("on_commit", None)
@@ -0,0 +1,85 @@
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+_WHITESPACE = re.compile(r"\s+")
+_PARAMS = re.compile(r"\$\d+|%\(\w+\)s|\b\d+\b|'(?:[^']|'')*'")
+
+
+def statement_shape(statement: str) -> str:
+    """Форма запроса: без литералов и номеров параметров"""
+    return _WHITESPACE.sub(" ", _PARAMS.sub("?", statement)).strip()
+
+
+class QueryStats:
+    """Статистика SQL запросов одного HTTP запроса"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_time = 0.0
+        self.slowest_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.shapes: Counter = Counter()
+
+    def record(self, statement: str, duration: float):
+        """Учет выполненного запроса"""
+        self.count += 1
+        self.total_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+        self.shapes[statement_shape(statement)] += 1
+
+    def repeated(self, threshold: int) -> List[Tuple[str, int]]:
+        """Формы запросов, повторенные больше threshold раз (кандидаты в N+1)"""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count > threshold]
+
+    def server_timing(self) -> str:
+        """Значение заголовка Server-Timing"""
+        return f'db;dur={self.total_time * 1000:.1f};desc="{self.count} queries"'
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar('_query_stats', default=None)
+
+
+def start_query_stats() -> Tuple[QueryStats, object]:
+    """Начало сбора статистики в текущем контексте"""
+    stats = QueryStats()
+    return stats, _query_stats.set(stats)
+
+
+def stop_query_stats(token):
+    """Завершение сбора статистики"""
+    _query_stats.reset(token)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info["query_started"].pop()
+    stats = _query_stats.get()
+    if stats is not None:
+        stats.record(statement, time.perf_counter() - started)
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None and conn.info.get("query_started"):
+        conn.info["query_started"].pop()
+
+
+def instrument_engine(engine: AsyncEngine):
+    """Подключение учета запросов к движку"""
+    sync_engine = engine.sync_engine
+    if event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(sync_engine, "handle_error", _handle_error)
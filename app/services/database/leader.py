@@ -0,0 +1,133 @@
+import os
+import sys
+import asyncio
+from typing import Awaitable, Callable, Optional
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Ключ advisory lock лидера (миграции используют 7_300_001)
+LEADER_LOCK_KEY = 7_300_002
+
+Callback = Callable[[], Awaitable[None]]
+
+
+class LeaderElection:
+    """
+    Выбор лидера среди процессов через pg_try_advisory_lock
+
+    Лидер держит соединение с захваченной блокировкой, пока жив процесс.
+    Остальные периодически пытаются захватить блокировку и становятся
+    лидером, когда прежний лидер завершился (или потерял соединение)
+    """
+
+    def __init__(self, engine: AsyncEngine, key: int = LEADER_LOCK_KEY, interval: float = 5):
+        """
+        Args:
+            engine: Движок основной базы
+            key: Ключ advisory lock
+            interval: Период попыток захвата и проверки соединения, с
+        """
+        self.engine = engine
+        self.key = key
+        self.interval = interval
+        self._conn: Optional[AsyncConnection] = None
+        self._task: Optional[asyncio.Task] = None
+        self._on_elected: Optional[Callback] = None
+        self._on_lost: Optional[Callback] = None
+
+    @property
+    def is_leader(self) -> bool:
+        return self._conn is not None
+
+    async def start(self, on_elected: Callback, on_lost: Optional[Callback] = None):
+        """Запуск выборов: on_elected вызывается при получении лидерства, on_lost - при потере"""
+        if self._task is not None:
+            return
+        self._on_elected = on_elected
+        self._on_lost = on_lost
+        await self._step()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Остановка и освобождение блокировки"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._conn is not None:
+            try:
+                await self._conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": self.key})
+            except Exception as e:
+                logger.warn(f"Не удалось освободить блокировку лидера: {e}")
+            await self._release()
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self._step()
+
+    async def _step(self):
+        """Попытка захвата (для ведомого) или проверка соединения (для лидера)"""
+        if self.is_leader:
+            try:
+                await self._conn.execute(text("SELECT 1"))
+            except Exception as e:
+                logger.error(f"Потеряно соединение лидера: {e}")
+                await self._release()
+                if self._on_lost is not None:
+                    await self._on_lost()
+            return
+        if not await self._try_acquire():
+            return
+        logger.info(f"Процесс {os.getpid()} стал лидером")
+        try:
+            await self._on_elected()
+        except Exception as e:
+            logger.error(f"Ошибка запуска лидера: {e}")
+
+    async def _try_acquire(self) -> bool:
+        conn = None
+        try:
+            conn = await self.engine.connect()
+            # блокировка сессионная, транзакция не нужна: без AUTOCOMMIT проверки
+            # лидера оставляли бы соединение "idle in transaction"
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            acquired = await conn.scalar(text("SELECT pg_try_advisory_lock(:key)"), {"key": self.key})
+        except Exception as e:
+            logger.warn(f"Не удалось проверить блокировку лидера: {e}")
+            # запрос мог выполниться до ошибки: соединение с блокировкой в пул не возвращаем
+            if conn is not None:
+                await self._discard(conn)
+            return False
+        if not acquired:
+            await conn.close()
+            return False
+        self._conn = conn
+        return True
+
+    async def _release(self):
+        conn, self._conn = self._conn, None
+        await self._discard(conn)
+
+    @staticmethod
+    async def _discard(conn: AsyncConnection):
+        """
+        Закрытие соединения без возврата в пул
+
+        Сессионная advisory lock живет, пока жива серверная сессия: вернувшись
+        в пул, соединение продолжало бы держать блокировку, и лидера бы не стало
+        """
+        try:
+            await conn.invalidate()
+        except Exception:
+            pass
+        try:
+            await conn.close()
+        except Exception:
+            pass
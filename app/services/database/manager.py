@@ -1,33 +1,48 @@
 import os
 import sys
-from sqlalchemy import select, func
-from typing import List, Optional, Any, TypeVar
+from sqlalchemy import select, func, insert, update, delete, inspect, text
+from sqlalchemy.orm import make_transient_to_detached
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, TypeVar, Union
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.context import get_session
+from database.context import get_session, save_changes, on_commit
+from database.cache import QueryCache
 
 T = TypeVar("T")
 
 class BaseManager:
     """Менеджер объектов в стиле Django"""
+
+    # Общий кеш запросов для всех моделей (None - кеш выключен)
+    cache: Optional[QueryCache] = None
     
     def __init__(self, model_class):
         self.model_class = model_class
+
+    @classmethod
+    def configure_cache(cls, cache: Optional[QueryCache]):
+        """Подключение кеша запросов"""
+        cls.cache = cache
     
     async def create(self, **kwargs: Any):
         """Создание новой записи"""
-        session = get_session()
+        session = get_session(read_only=False)
         instance = self.model_class(**kwargs)
         session.add(instance)
-        await session.commit()
-        await session.refresh(instance)
+        await self.notify_changed(session)
+        await save_changes(session)
         return instance
     
     async def get(self, id: int) -> Optional[Any]:
         """Получение записи по ID"""
         session = get_session()
-        return await session.get(self.model_class, id)
+        return await self._cached(
+            "get", id,
+            load=lambda: session.get(self.model_class, id),
+            dump=self._dump,
+            restore=lambda data: self._restore(session, data)
+        )
     
     async def all(self, skip: int = 0, limit: int = 100) -> List[Any]:
         """Получение всех записей с пагинацией"""
@@ -39,31 +54,78 @@ class BaseManager:
     async def filter(self, **filters: Any) -> List[Any]:
         """Фильтрация записей по параметрам"""
         session = get_session()
-        stmt = select(self.model_class)
-        for key, value in filters.items():
-            if hasattr(self.model_class, key):
-                stmt = stmt.where(getattr(self.model_class, key) == value)
-        result = await session.execute(stmt)
-        return list(result.scalars().all())
+
+        async def load():
+            stmt = self._apply_filters(select(self.model_class), filters)
+            result = await session.execute(stmt)
+            return list(result.scalars().all())
+
+        async def restore(rows):
+            return [await self._restore(session, data) for data in rows]
+
+        return await self._cached(
+            "filter", sorted(filters.items()),
+            load=load,
+            dump=lambda instances: [self._dump(instance) for instance in instances],
+            restore=restore
+        )
     
+    async def stream(self,
+                     batch_size: int = 1000,
+                     chunks: bool = False,
+                     columns: Optional[List[str]] = None,
+                     **filters: Any) -> AsyncIterator[Any]:
+        """
+        Потоковое чтение записей через серверный курсор
+
+        В памяти одновременно находится не больше batch_size строк
+
+        Args:
+            batch_size: Количество строк, забираемых с сервера за раз
+            chunks: Отдавать списки по batch_size вместо отдельных строк
+            columns: Читать только эти поля (строки вместо объектов модели)
+            **filters: Условия отбора (поле == значение)
+        """
+        session = get_session()
+        if columns:
+            stmt = select(*(getattr(self.model_class, column) for column in columns))
+        else:
+            stmt = select(self.model_class)
+        stmt = self._apply_filters(stmt, filters).order_by(self.model_class.id)
+        stmt = stmt.execution_options(yield_per=batch_size)
+        if columns:
+            result = await session.stream(stmt)
+        else:
+            result = await session.stream_scalars(stmt)
+        try:
+            async for partition in result.partitions(batch_size):
+                if chunks:
+                    yield list(partition)
+                else:
+                    for row in partition:
+                        yield row
+        finally:
+            await result.close()
+
     async def update(self, id: int, **kwargs: Any) -> Optional[Any]:
         """Обновление записи по ID"""
-        session = get_session()
+        session = get_session(read_only=False)
         instance = await session.get(self.model_class, id)
         if instance:
             for key, value in kwargs.items():
                 setattr(instance, key, value)
-            await session.commit()
-            await session.refresh(instance)
+            await self.notify_changed(session)
+            await save_changes(session)
         return instance
     
     async def delete(self, id: int) -> bool:
         """Удаление записи по ID"""
-        session = get_session()
+        session = get_session(read_only=False)
         instance = await session.get(self.model_class, id)
         if instance:
             await session.delete(instance)
-            await session.commit()
+            await self.notify_changed(session)
+            await save_changes(session)
             return True
         return False
     
@@ -74,14 +136,41 @@ class BaseManager:
         result = await session.execute(stmt)
         return result.scalar()
     
+    async def version(self) -> int:
+        """
+        Счетчик изменений таблицы из table_versions
+
+        Ведется триггером в базе, поэтому учитывает записи из любого процесса
+        и админ-панели. Читается мимо кеша запросов и с основной базы: реплика
+        отстает, а после этого чтения и остальные чтения запроса идут с основной
+        базы, поэтому ETag и тело ответа согласованы. Триггер есть только у
+        applications (миграция 0007): счетчик - одна строка, на которой
+        выстраиваются все пишущие в таблицу транзакции, для остальных таблиц 0
+        """
+        session = get_session(read_only=False)
+        result = await session.execute(
+            text("SELECT version FROM table_versions WHERE table_name = :table_name"),
+            {"table_name": self.model_class.__tablename__}
+        )
+        return result.scalar() or 0
+
     async def get_by_field(self, field_name: str, value: Any) -> Optional[T]:
         """Получение одной записи по полю"""
         session = get_session()
-        if hasattr(self.model_class, field_name):
+        if not hasattr(self.model_class, field_name):
+            return None
+
+        async def load():
             stmt = select(self.model_class).where(getattr(self.model_class, field_name) == value)
             result = await session.execute(stmt)
             return result.scalars().first()
-        return None
+
+        return await self._cached(
+            "get_by_field", (field_name, value),
+            load=load,
+            dump=self._dump,
+            restore=lambda data: self._restore(session, data)
+        )
     
     async def get_or_create(self, defaults: dict = None, **kwargs) -> Any:
         """Получить или создать запись"""
@@ -96,10 +185,143 @@ class BaseManager:
     async def exists(self, **filters) -> bool:
         """Проверка существования записи"""
         session = get_session()
-        stmt = select(self.model_class.id)
+
+        async def load():
+            stmt = self._apply_filters(select(self.model_class.id), filters)
+            stmt = stmt.limit(1)
+            result = await session.execute(stmt)
+            return result.scalar() is not None
+
+        return await self._cached("exists", sorted(filters.items()), load=load)
+
+    async def bulk_create(self, rows: List[Dict[str, Any]], returning: bool = False) -> List[Any]:
+        """
+        Создание множества записей одним INSERT
+
+        Args:
+            rows: Список словарей с данными записей
+            returning: Вернуть созданные объекты (INSERT ... RETURNING)
+        """
+        if not rows:
+            return []
+        session = get_session(read_only=False)
+        stmt = insert(self.model_class)
+        instances = []
+        if returning:
+            result = await session.scalars(stmt.returning(self.model_class), rows)
+            instances = list(result.all())
+        else:
+            await session.execute(stmt, rows)
+        await self.notify_changed(session)
+        await save_changes(session)
+        return instances
+
+    async def bulk_update(self, filters: Dict[str, Any], values: Dict[str, Any], returning: bool = False) -> Union[int, List[Any]]:
+        """
+        Обновление записей одним UPDATE ... WHERE
+
+        Args:
+            filters: Условия отбора записей (поле == значение)
+            values: Новые значения полей
+            returning: Вернуть обновленные объекты вместо количества строк
+        """
+        session = get_session(read_only=False)
+        stmt = self._apply_filters(update(self.model_class), filters, strict=True).values(**values)
+        if returning:
+            result = await session.scalars(stmt.returning(self.model_class))
+            instances = list(result.all())
+            await self.notify_changed(session)
+            await save_changes(session)
+            return instances
+        result = await session.execute(stmt)
+        await self.notify_changed(session)
+        await save_changes(session)
+        return result.rowcount
+
+    async def bulk_delete(self, filters: Dict[str, Any], returning: bool = False) -> Union[int, List[Any]]:
+        """
+        Удаление записей одним DELETE ... WHERE
+
+        Args:
+            filters: Условия отбора записей (поле == значение)
+            returning: Вернуть удаленные объекты вместо количества строк
+        """
+        session = get_session(read_only=False)
+        stmt = self._apply_filters(delete(self.model_class), filters, strict=True)
+        if returning:
+            result = await session.scalars(stmt.returning(self.model_class))
+            instances = list(result.all())
+            await self.notify_changed(session)
+            await save_changes(session)
+            return instances
+        result = await session.execute(stmt)
+        await self.notify_changed(session)
+        await save_changes(session)
+        return result.rowcount
+
+    def _apply_filters(self, stmt, filters: Dict[str, Any], strict: bool = False):
+        """
+        Добавление условий поле == значение к запросу
+
+        Args:
+            strict: Ошибка на неизвестное поле вместо пропуска
+                    (для массовых UPDATE/DELETE, чтобы опечатка не задела всю таблицу)
+        """
         for key, value in filters.items():
             if hasattr(self.model_class, key):
                 stmt = stmt.where(getattr(self.model_class, key) == value)
-        stmt = stmt.limit(1)
-        result = await session.execute(stmt)
-        return result.scalar() is not None
\ No newline at end of file
+            elif strict:
+                raise ValueError(f"{self.model_class.__name__} не содержит поле {key}")
+        return stmt
+
+    async def invalidate_cache(self):
+        """Сброс закешированных результатов модели"""
+        if self.cache is not None:
+            await self.cache.invalidate(self.model_class)
+
+    def snapshot(self, instance) -> Optional[Dict[str, Any]]:
+        """Значения колонок объекта для хранения вне сессии (in-process кеши)"""
+        return self._dump(instance)
+
+    async def from_snapshot(self, data: Optional[Dict[str, Any]]) -> Optional[T]:
+        """Объект из snapshot(), привязанный к текущей сессии без запроса в БД"""
+        return await self._restore(get_session(), data)
+
+    async def notify_changed(self, session):
+        """Сброс кеша при записи: сразу и еще раз после коммита"""
+        if self.cache is None:
+            return
+        await self.invalidate_cache()
+        on_commit(session, self.invalidate_cache, key=("cache", self.model_class.__tablename__))
+
+    async def _cached(self,
+                      op: str,
+                      params: Any,
+                      load: Callable[[], Awaitable[Any]],
+                      dump: Optional[Callable[[Any], Any]] = None,
+                      restore: Optional[Callable[[Any], Awaitable[Any]]] = None) -> Any:
+        """Чтение через кеш запросов, если он включен для модели"""
+        cache = self.cache
+        if cache is None or not cache.enabled_for(self.model_class):
+            return await load()
+        key = await cache.make_key(self.model_class, op, params)
+        hit, payload = await cache.get(self.model_class, key)
+        if hit:
+            return await restore(payload) if restore else payload
+        value = await load()
+        await cache.set(self.model_class, key, dump(value) if dump else value)
+        return value
+
+    def _dump(self, instance) -> Optional[Dict[str, Any]]:
+        """Значения колонок объекта для кеша"""
+        if instance is None:
+            return None
+        return {attr.key: getattr(instance, attr.key) for attr in inspect(self.model_class).column_attrs}
+
+    async def _restore(self, session, data: Optional[Dict[str, Any]]):
+        """Объект из кеша, привязанный к сессии без запроса в БД"""
+        if data is None:
+            return None
+        instance = self.model_class(**data)
+        make_transient_to_detached(instance)
+        return await session.merge(instance, load=False)
@@ -1,49 +1,94 @@
-from fastapi import Request, Response
-import functools
 import os
 import sys
-from starlette.middleware.base import BaseHTTPMiddleware
+import time
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.config import async_session
-from database.context import set_session, reset_session
+from database.config import async_session, async_replica_session
+from database.context import lazy_session, SAFE_METHODS
+from database.instrumentation import start_query_stats, stop_query_stats
+from app.cors.settings import settings
 from app.cors.logger.logger import get_logger
 
 
 logger = get_logger(__name__)
 
 
-async def db_session_middleware(request: Request, call_next):
-    """Middleware для управления сессиями БД"""
-    async with async_session() as session:
-        token = set_session(session)
+class DBSessionMiddleware:
+    """
+    Pure ASGI middleware для управления сессиями БД
+
+    Привязывает к запросу ленивую сессию: соединение берется из пула только
+    при первом get_session(), коммит выполняется перед отправкой ответа
+    и только если в сессии были изменения. Запросы безопасными методами
+    по умолчанию читают с реплики
+    """
+
+    def __init__(self, app: ASGIApp, session_factory = async_session, replica_session_factory = async_replica_session):
+        self.app = app
+        self.session_factory = session_factory
+        self.replica_session_factory = replica_session_factory
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            read_only = scope["method"] in SAFE_METHODS
+            async with lazy_session(self.session_factory, self.replica_session_factory, read_only) as session:
+                async def send_wrapper(message: Message):
+                    if message["type"] == "http.response.start":
+                        await session.commit()
+                    await send(message)
+
+                await self.app(scope, receive, send_wrapper)
+        except Exception:
+            logger.warn("Ошибка при обработке запроса ROLLBACK")
+            raise
+
+
+class QueryStatsMiddleware:
+    """
+    Pure ASGI middleware учета SQL запросов
+
+    Добавляет к ответу заголовок Server-Timing (время и количество запросов),
+    пишет в лог самый медленный запрос и предупреждает о повторяющихся
+    запросах (N+1). Подключается снаружи DBSessionMiddleware, чтобы учесть коммит
+    """
+
+    def __init__(self, app: ASGIApp, n_plus_one_threshold: int = settings.SQL_N_PLUS_ONE_THRESHOLD):
+        self.app = app
+        self.n_plus_one_threshold = n_plus_one_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats, token = start_query_stats()
+        started = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            if message["type"] == "http.response.start" and stats.count:
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", stats.server_timing())
+            await send(message)
+
         try:
-            response = await call_next(request)
-            await session.commit()
-            return response
-        except Exception as e:
-            await session.rollback()
-            raise e
+            await self.app(scope, receive, send_wrapper)
         finally:
-            reset_session(token)
-            await session.close()
-
-
-class DBSessionMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        logger.info("DBSessionMiddleware: устанавливаю сессию")
-        async with async_session() as session:
-            token = set_session(session)
-            try:
-                response = await call_next(request)
-                await session.commit()
-                logger.info("Запрос обработан успешно")
-                return response
-            except Exception as e:
-                await session.rollback()
-                logger.warn("Ошибка при обработке заросса ROLLBACK")
-                raise e
-            finally:
-                reset_session(token)
-                await session.close()
\ No newline at end of file
+            stop_query_stats(token)
+            if stats.count:
+                self._log(scope, stats, time.perf_counter() - started)
+
+    def _log(self, scope: Scope, stats, duration: float):
+        """Итоги запроса в лог"""
+        path = f'{scope["method"]} {scope["path"]}'
+        logger.info(
+            f"{path}: {stats.count} SQL, {stats.total_time * 1000:.1f} ms из {duration * 1000:.1f} ms, "
+            f"самый медленный {stats.slowest_time * 1000:.1f} ms: {stats.slowest_statement[:200]}"
+        )
+        for shape, count in stats.repeated(self.n_plus_one_threshold):
+            logger.warn(f"{path}: возможный N+1, запрос повторен {count} раз: {shape[:200]}")
+
@@ -0,0 +1,97 @@
+import os
+import sys
+import time
+import importlib
+import pkgutil
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+MIGRATIONS_TABLE = "schema_migrations"
+# Ключ advisory lock, чтобы два контейнера не применяли миграции одновременно
+MIGRATIONS_LOCK_KEY = 7_300_001
+
+
+@dataclass
+class Revision:
+    """Ревизия схемы"""
+    revision: str
+    description: str
+    upgrade: Callable[[AsyncConnection], Awaitable[None]]
+
+
+class MigrationEngine:
+    """
+    Инкрементальные миграции схемы
+
+    Ревизии лежат в пакете versions (файлы NNNN_name.py с async upgrade(conn)),
+    примененные ревизии записываются в таблицу schema_migrations.
+    upgrade() применяет только недостающие ревизии по порядку
+    """
+
+    def __init__(self, engine: AsyncEngine, versions_package: str = f"{__package__}.versions"):
+        self.engine = engine
+        self.versions_package = versions_package
+
+    def revisions(self) -> List[Revision]:
+        """Все ревизии по порядку"""
+        package = importlib.import_module(self.versions_package)
+        names = sorted(name for _, name, is_pkg in pkgutil.iter_modules(package.__path__) if not is_pkg)
+        revisions = []
+        for name in names:
+            module = importlib.import_module(f"{self.versions_package}.{name}")
+            revisions.append(Revision(
+                revision=name,
+                description=(module.__doc__ or "").strip(),
+                upgrade=module.upgrade
+            ))
+        return revisions
+
+    async def applied(self, conn: AsyncConnection) -> List[str]:
+        """Примененные ревизии"""
+        await conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {MIGRATIONS_TABLE} ("
+            "revision VARCHAR PRIMARY KEY, "
+            "applied_at TIMESTAMP NOT NULL DEFAULT now())"
+        ))
+        result = await conn.execute(text(f"SELECT revision FROM {MIGRATIONS_TABLE} ORDER BY revision"))
+        return list(result.scalars().all())
+
+    async def pending(self) -> List[Revision]:
+        """Ревизии, которые еще не применены"""
+        async with self.engine.begin() as conn:
+            applied = set(await self.applied(conn))
+        return [revision for revision in self.revisions() if revision.revision not in applied]
+
+    async def upgrade(self) -> List[str]:
+        """Применение недостающих ревизий, возвращает их имена"""
+        started = time.perf_counter()
+        revisions = self.revisions()
+        async with self.engine.begin() as conn:
+            applied = set(await self.applied(conn))
+            if all(revision.revision in applied for revision in revisions):
+                logger.info(f"Схема актуальна ({(time.perf_counter() - started) * 1000:.1f} ms)")
+                return []
+            await conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATIONS_LOCK_KEY})
+            # Пока ждали блокировку, миграции мог применить другой процесс
+            applied = set(await self.applied(conn))
+            done = []
+            for revision in revisions:
+                if revision.revision in applied:
+                    continue
+                logger.info(f"Применяю ревизию {revision.revision}: {revision.description}")
+                await revision.upgrade(conn)
+                await conn.execute(
+                    text(f"INSERT INTO {MIGRATIONS_TABLE} (revision) VALUES (:revision)"),
+                    {"revision": revision.revision}
+                )
+                done.append(revision.revision)
+        logger.info(f"Применено ревизий: {len(done)} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+        return done
@@ -0,0 +1,96 @@
+"""Начальная схема: таблицы моделей (существующие таблицы не трогаются)"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# DDL зафиксирован на момент ревизии и не зависит от текущих моделей
+STATEMENTS = (
+    "CREATE TABLE IF NOT EXISTS admins ("
+    "id BIGSERIAL NOT NULL, "
+    "user_name VARCHAR NOT NULL, "
+    "password VARCHAR NOT NULL, "
+    "is_active BOOLEAN NOT NULL, "
+    "PRIMARY KEY (id), "
+    "UNIQUE (user_name))",
+    "CREATE INDEX IF NOT EXISTS ix_admins_id ON admins (id)",
+
+    "CREATE TABLE IF NOT EXISTS application_legacy ("
+    "id BIGSERIAL NOT NULL, "
+    "full_name VARCHAR NOT NULL, "
+    "phone_number VARCHAR NOT NULL, "
+    "telegram_id VARCHAR NOT NULL, "
+    "telegram_user_name VARCHAR NOT NULL, "
+    "status VARCHAR NOT NULL, "
+    "created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+    "PRIMARY KEY (id))",
+    "CREATE INDEX IF NOT EXISTS ix_application_legacy_id ON application_legacy (id)",
+
+    "CREATE TABLE IF NOT EXISTS applications ("
+    "id BIGSERIAL NOT NULL, "
+    "full_name VARCHAR NOT NULL, "
+    "creative_skills VARCHAR, "
+    "phone_number VARCHAR NOT NULL, "
+    "telegram_id VARCHAR NOT NULL, "
+    "telegram_user_name VARCHAR NOT NULL, "
+    "vk_username VARCHAR NOT NULL, "
+    "status VARCHAR NOT NULL, "
+    "created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+    "PRIMARY KEY (id), "
+    "UNIQUE (full_name), "
+    "UNIQUE (phone_number), "
+    "UNIQUE (telegram_id), "
+    "UNIQUE (telegram_user_name), "
+    "UNIQUE (vk_username))",
+    "CREATE INDEX IF NOT EXISTS ix_applications_id ON applications (id)",
+
+    "CREATE TABLE IF NOT EXISTS users_legacy ("
+    "id BIGSERIAL NOT NULL, "
+    "full_name VARCHAR NOT NULL, "
+    "phone_number VARCHAR NOT NULL, "
+    "telegram_id VARCHAR NOT NULL, "
+    "telegram_user_name VARCHAR NOT NULL, "
+    "is_active BOOLEAN NOT NULL, "
+    "is_admin BOOLEAN NOT NULL, "
+    "status VARCHAR NOT NULL, "
+    "updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+    "created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+    "PRIMARY KEY (id), "
+    "UNIQUE (full_name), "
+    "UNIQUE (phone_number), "
+    "UNIQUE (telegram_id), "
+    "UNIQUE (telegram_user_name))",
+    "CREATE INDEX IF NOT EXISTS ix_users_legacy_id ON users_legacy (id)",
+
+    "CREATE TABLE IF NOT EXISTS users ("
+    "id BIGSERIAL NOT NULL, "
+    "full_name VARCHAR NOT NULL, "
+    "passport_series VARCHAR, "
+    "passport_number VARCHAR, "
+    "actual_address VARCHAR, "
+    "address_registered VARCHAR, "
+    "educational_group VARCHAR, "
+    "educational_faculty VARCHAR, "
+    "creative_skills VARCHAR, "
+    "phone_number VARCHAR NOT NULL, "
+    "telegram_id VARCHAR NOT NULL, "
+    "telegram_user_name VARCHAR NOT NULL, "
+    "vk_username VARCHAR NOT NULL, "
+    "is_active BOOLEAN NOT NULL, "
+    "is_admin BOOLEAN NOT NULL, "
+    "status VARCHAR NOT NULL, "
+    "updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+    "created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+    "PRIMARY KEY (id), "
+    "UNIQUE (full_name), "
+    "UNIQUE (passport_series), "
+    "UNIQUE (passport_number), "
+    "UNIQUE (phone_number), "
+    "UNIQUE (telegram_id), "
+    "UNIQUE (telegram_user_name), "
+    "UNIQUE (vk_username))",
+    "CREATE INDEX IF NOT EXISTS ix_users_id ON users (id)",
+)
+
+
+async def upgrade(conn: AsyncConnection):
+    for statement in STATEMENTS:
+        await conn.execute(text(statement))
@@ -0,0 +1,14 @@
+"""Индексы для выборки заявок по статусу"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_applications_status_created_at "
+        "ON applications (status, created_at)"
+    ))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_application_legacy_telegram_id_status "
+        "ON application_legacy (telegram_id, status)"
+    ))
@@ -0,0 +1,24 @@
+"""Рассылки: таблица broadcasts и отметка пользователей, заблокировавших бота"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "ALTER TABLE users ADD COLUMN IF NOT EXISTS is_bot_blocked BOOLEAN NOT NULL DEFAULT false"
+    ))
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS broadcasts ("
+        "id BIGSERIAL NOT NULL, "
+        "text TEXT NOT NULL, "
+        "status VARCHAR NOT NULL, "
+        "cursor BIGINT NOT NULL, "
+        "sent INTEGER NOT NULL, "
+        "failed INTEGER NOT NULL, "
+        "blocked INTEGER NOT NULL, "
+        "created_by VARCHAR, "
+        "updated_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+        "PRIMARY KEY (id))"
+    ))
+    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_broadcasts_id ON broadcasts (id)"))
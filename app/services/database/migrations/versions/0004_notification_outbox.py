@@ -0,0 +1,23 @@
+"""Outbox уведомлений в Telegram"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS notification_outbox ("
+        "id BIGSERIAL NOT NULL, "
+        "chat_id VARCHAR NOT NULL, "
+        "text TEXT NOT NULL, "
+        "reply_markup JSON, "
+        "attempts INTEGER NOT NULL, "
+        "last_error TEXT, "
+        "next_attempt_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+        "PRIMARY KEY (id))"
+    ))
+    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_notification_outbox_id ON notification_outbox (id)"))
+    await conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_notification_outbox_next_attempt_at "
+        "ON notification_outbox (next_attempt_at)"
+    ))
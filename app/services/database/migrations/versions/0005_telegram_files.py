@@ -0,0 +1,17 @@
+"""file_id документов, уже загруженных в Telegram"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS telegram_files ("
+        "id BIGSERIAL NOT NULL, "
+        "content_hash VARCHAR(64) NOT NULL, "
+        "file_id VARCHAR NOT NULL, "
+        "file_name VARCHAR, "
+        "created_at TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL, "
+        "PRIMARY KEY (id), "
+        "UNIQUE (content_hash))"
+    ))
+    await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_telegram_files_id ON telegram_files (id)"))
@@ -0,0 +1,33 @@
+"""Счетчики изменений таблиц для ETag (ведутся триггерами)"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Таблицы, для которых ведется счетчик
+VERSIONED_TABLES = ("applications", "users")
+
+
+async def upgrade(conn: AsyncConnection):
+    await conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS table_versions ("
+        "table_name VARCHAR PRIMARY KEY, "
+        "version BIGINT NOT NULL DEFAULT 0)"
+    ))
+    await conn.execute(text(
+        "CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$ "
+        "BEGIN "
+        "INSERT INTO table_versions (table_name, version) VALUES (TG_TABLE_NAME, 1) "
+        "ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1; "
+        "RETURN NULL; "
+        "END; $$ LANGUAGE plpgsql"
+    ))
+    for table in VERSIONED_TABLES:
+        await conn.execute(text(
+            f"INSERT INTO table_versions (table_name) VALUES ('{table}') ON CONFLICT DO NOTHING"
+        ))
+        await conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_bump_version ON {table}"))
+        # FOR EACH STATEMENT: одно увеличение на запрос, сколько бы строк он ни менял
+        await conn.execute(text(
+            f"CREATE TRIGGER {table}_bump_version "
+            f"AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()"
+        ))
@@ -0,0 +1,53 @@
+"""Счетчик изменений только для applications и только при реально измененных строках"""
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+# Каждое увеличение счетчика - upsert одной строки table_versions: запись держит
+# блокировку этой строки до конца транзакции, и пишущие в таблицу транзакции
+# выстраиваются в очередь. Поэтому счетчик ведется только там, где он нужен для
+# ETag (список заявок, записи в applications редки), а для users его больше нет:
+# туда часто пишут рассылка (is_bot_blocked), авторизация и админ-панель
+VERSIONED_TABLES = ("applications",)
+UNVERSIONED_TABLES = ("users",)
+
+
+async def upgrade(conn: AsyncConnection):
+    # changed_rows - transition table триггера; запрос, не изменивший ни одной
+    # строки, счетчик не увеличивает и ETag не сбрасывает
+    await conn.execute(text(
+        "CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$ "
+        "BEGIN "
+        "IF TG_OP <> 'TRUNCATE' THEN "
+        "IF NOT EXISTS (SELECT 1 FROM changed_rows) THEN RETURN NULL; END IF; "
+        "END IF; "
+        "INSERT INTO table_versions (table_name, version) VALUES (TG_TABLE_NAME, 1) "
+        "ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1; "
+        "RETURN NULL; "
+        "END; $$ LANGUAGE plpgsql"
+    ))
+    for table in UNVERSIONED_TABLES:
+        await conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_bump_version ON {table}"))
+        await conn.execute(text(f"DELETE FROM table_versions WHERE table_name = '{table}'"))
+    for table in VERSIONED_TABLES:
+        await conn.execute(text(f"DROP TRIGGER IF EXISTS {table}_bump_version ON {table}"))
+        # transition table можно объявить только у триггера на одно событие
+        for event, referencing in (
+            ("INSERT", "NEW TABLE AS changed_rows"),
+            ("UPDATE", "NEW TABLE AS changed_rows"),
+            ("DELETE", "OLD TABLE AS changed_rows"),
+        ):
+            name = f"{table}_bump_version_{event.lower()}"
+            await conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+            await conn.execute(text(
+                f"CREATE TRIGGER {name} "
+                f"AFTER {event} ON {table} "
+                f"REFERENCING {referencing} "
+                f"FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()"
+            ))
+        name = f"{table}_bump_version_truncate"
+        await conn.execute(text(f"DROP TRIGGER IF EXISTS {name} ON {table}"))
+        await conn.execute(text(
+            f"CREATE TRIGGER {name} "
+            f"AFTER TRUNCATE ON {table} "
+            f"FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()"
+        ))
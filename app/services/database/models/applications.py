@@ -1,7 +1,7 @@
 import os
 import sys
 from datetime import datetime
-from sqlalchemy import BigInteger, String, DateTime, func, Boolean
+from sqlalchemy import BigInteger, String, DateTime, func, Boolean, Index
 from sqlalchemy.orm import Mapped, mapped_column
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -12,7 +12,10 @@ from database.models.base import Base
 class Applications(Base):
     """Модель заявки на всупление"""
     __tablename__ = "application_legacy"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_application_legacy_telegram_id_status", "telegram_id", "status"),
+        {'extend_existing': True},
+    )
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     # Паспортные данные mapped_column()
     full_name: Mapped[str] = mapped_column(String, nullable=False)
@@ -41,7 +44,10 @@ class Applications(Base):
 class ApplicationsLatest(Base):
     """Модель заявки на всупление"""
     __tablename__ = "applications"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_applications_status_created_at", "status", "created_at"),
+        {'extend_existing': True},
+    )
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
     # Паспортные данные mapped_column()
     full_name: Mapped[str] = mapped_column(String, unique=True, nullable=False)
@@ -92,7 +98,7 @@ class Users(Base):
     is_active : Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     is_admin : Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     status : Mapped[str] = mapped_column(String, nullable=False , default="Кандидат")
-    updated_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+    updated_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
     created_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now()) 
     
     
@@ -11,9 +11,9 @@ from functools import wraps
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from database.manager import BaseManager
-from database.context import get_session
+from database.context import get_session, save_changes
 
-from sqlalchemy import TypeDecorator, String
+from sqlalchemy import TypeDecorator, String, inspect
 
 
 
@@ -41,17 +41,34 @@ class HashMetaMapped(DeclarativeMeta):
 class Base(DeclarativeBase):
     """Базовый класс с менеджером подобие Django ORM"""
     objects: BaseManager = None
+    # Серверные значения по умолчанию забираются через RETURNING при flush
+    __mapper_args__ = {"eager_defaults": True}
     
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
         cls.objects = BaseManager(cls)
     
     async def save(self) -> None:
-        """Сохранение текущего экземпляра"""
-        session = get_session()
-        session.add(self)
-        await session.commit()
-        await session.refresh(self)
+        """
+        Сохранение текущего экземпляра
+
+        Объект другой сессии (прочитан с реплики в GET запросе) в сессию основной
+        базы не добавляется: там перечитывается строка и переносятся только
+        измененные поля, чтобы не записать устаревшую копию остальных
+        """
+        session = get_session(read_only=False)
+        state = inspect(self)
+        if state.session is not None and state.session is not session.sync_session:
+            target = await session.get(type(self), state.identity)
+            if target is None:
+                raise ValueError(f"{type(self).__name__} {state.identity} не найден в основной базе")
+            for attr in state.attrs:
+                if attr.history.has_changes():
+                    setattr(target, attr.key, attr.value)
+        else:
+            session.add(self)
+        await self.objects.notify_changed(session)
+        await save_changes(session)
 
 
 
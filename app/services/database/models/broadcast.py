@@ -0,0 +1,27 @@
+import os
+import sys
+from datetime import datetime
+from sqlalchemy import BigInteger, Integer, String, Text, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models.base import Base
+
+
+class Broadcast(Base):
+    """Рассылка всем участникам"""
+    __tablename__ = "broadcasts"
+    __table_args__ = {'extend_existing': True}
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
+    text : Mapped[str] = mapped_column(Text, nullable=False)
+    # running, done, cancelled
+    status : Mapped[str] = mapped_column(String, nullable=False, default='running')
+    # id последнего обработанного пользователя, с него рассылка продолжается после рестарта
+    cursor : Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    sent : Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    failed : Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    blocked : Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_by : Mapped[str] = mapped_column(String, nullable=True)
+    updated_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
+    created_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
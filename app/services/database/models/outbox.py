@@ -0,0 +1,26 @@
+import os
+import sys
+from datetime import datetime
+from sqlalchemy import BigInteger, Integer, String, Text, DateTime, JSON, Index, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models.base import Base
+
+
+class NotificationOutbox(Base):
+    """Исходящее уведомление в Telegram, пишется в одной транзакции с изменением"""
+    __tablename__ = "notification_outbox"
+    __table_args__ = (
+        Index("ix_notification_outbox_next_attempt_at", "next_attempt_at"),
+        {'extend_existing': True},
+    )
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
+    chat_id : Mapped[str] = mapped_column(String, nullable=False)
+    text : Mapped[str] = mapped_column(Text, nullable=False)
+    reply_markup : Mapped[dict] = mapped_column(JSON, nullable=True)
+    attempts : Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    last_error : Mapped[str] = mapped_column(Text, nullable=True)
+    next_attempt_at : Mapped[DateTime] = mapped_column(DateTime, nullable=False, server_default=func.now())
+    created_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
@@ -0,0 +1,21 @@
+import os
+import sys
+from datetime import datetime
+from sqlalchemy import BigInteger, String, DateTime, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.models.base import Base
+
+
+class TelegramFile(Base):
+    """file_id загруженного в Telegram документа по хешу содержимого"""
+    __tablename__ = "telegram_files"
+    __table_args__ = {'extend_existing': True}
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
+    # sha256 содержимого файла
+    content_hash : Mapped[str] = mapped_column(String(64), unique=True, nullable=False)
+    file_id : Mapped[str] = mapped_column(String, nullable=False)
+    file_name : Mapped[str] = mapped_column(String, nullable=True)
+    created_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
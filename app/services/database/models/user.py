@@ -1,7 +1,7 @@
 import os
 import sys
 from datetime import datetime
-from sqlalchemy import BigInteger, String, DateTime, func, Boolean
+from sqlalchemy import BigInteger, String, DateTime, func, Boolean, false
 from sqlalchemy.orm import Mapped, mapped_column
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -32,7 +32,9 @@ class UsersLatest(Base):
     # meta
     is_active : Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
     is_admin : Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # Пользователь заблокировал бота, рассылки его пропускают
+    is_bot_blocked : Mapped[bool] = mapped_column(Boolean, nullable=False, default=False, server_default=false())
     status : Mapped[str] = mapped_column(String, nullable=False , default="Кандидат")
-    updated_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now())
+    updated_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now(), onupdate=func.now())
     created_at : Mapped[DateTime] = mapped_column(DateTime, server_default=func.now()) 
     
\ No newline at end of file
@@ -0,0 +1,58 @@
+import os
+import sys
+import sqlalchemy as sa
+from marshmallow import fields
+from marshmallow_sqlalchemy import ModelConverter, SQLAlchemyAutoSchema, SQLAlchemyAutoSchemaOpts
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class NativeDateTime(fields.DateTime):
+    """datetime при dump отдается как есть (в строку его переводит ORJSONResponse)"""
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        return value
+
+
+class NativeDate(fields.Date):
+    """date при dump отдается как есть"""
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        return value
+
+
+class NativeTime(fields.Time):
+    """time при dump отдается как есть"""
+
+    def _serialize(self, value, attr, obj, **kwargs):
+        return value
+
+
+class NativeModelConverter(ModelConverter):
+    """Конвертер колонок в поля с нативными датами"""
+    SQLA_TYPE_MAPPING = {
+        **ModelConverter.SQLA_TYPE_MAPPING,
+        sa.DateTime: NativeDateTime,
+        sa.Date: NativeDate,
+        sa.Time: NativeTime,
+    }
+
+
+class NativeSchemaOpts(SQLAlchemyAutoSchemaOpts):
+    """model_converter по умолчанию - NativeModelConverter"""
+
+    def __init__(self, meta, *args, **kwargs):
+        super().__init__(meta, *args, **kwargs)
+        if not hasattr(meta, "model_converter"):
+            self.model_converter = NativeModelConverter
+
+
+class NativeAutoSchema(SQLAlchemyAutoSchema):
+    """
+    Базовый сериалайзер для ответов API
+
+    dump оставляет datetime/date/time и Decimal объектами Python,
+    строками их делает ORJSONResponse, который нагруженные views
+    возвращают напрямую, минуя jsonable_encoder. Для json.dumps напрямую не подходит
+    """
+    OPTIONS_CLASS = NativeSchemaOpts
@@ -2,7 +2,7 @@ import os
 import sys
 from functools import wraps
 from fastapi import HTTPException, status
-from fastapi.responses import JSONResponse
+from app.cors.responses import ORJSONResponse
 from app.cors.logger.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,7 +19,7 @@ def handle_errors_wrraper():
                 return await func(*args, **kwargs)
             except HTTPException as e:
                 logger.warn(f"Ошибка обработки запроса {e}")
-                return JSONResponse({"details" : e.detail}, status_code=e.status_code)
+                return ORJSONResponse({"details" : e.detail}, status_code=e.status_code)
             except Exception as e:
                 logger.warn(f"Ошибка обработки запроса {e}")
                 raise HTTPException(
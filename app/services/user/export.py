@@ -0,0 +1,214 @@
+import os
+import sys
+import io
+import csv
+import glob
+import asyncio
+import hashlib
+import tempfile
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+from openpyxl import Workbook
+from sqlalchemy import func, select
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.context import get_session
+from app.cors.settings import settings
+from app.cors.logger.logger import get_logger
+
+logger = get_logger(__name__)
+
+EXPORT_FORMATS = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv; charset=utf-8",
+}
+
+# Поля участника для выгрузки администратору (без паспортных данных)
+MEMBER_EXPORT_COLUMNS = [
+    'full_name',
+    'phone_number',
+    'telegram_user_name',
+    'vk_username',
+    'educational_group',
+    'educational_faculty',
+    'creative_skills',
+    'status',
+    'created_at',
+]
+
+
+def _xlsx_append(sheet, rows: Sequence[Sequence[Any]]):
+    for row in rows:
+        sheet.append(list(row))
+
+
+def _csv_encode(rows: Sequence[Sequence[Any]]) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerows(rows)
+    return buffer.getvalue().encode()
+
+
+def _write_chunk(file, data: bytes):
+    file.write(data)
+
+
+class UserExporter:
+    """
+    Выгрузка участников в xlsx или csv
+
+    Строки читаются из базы пачками через BaseManager.stream, форматирование
+    пачки выполняется в отдельном потоке, чтобы не блокировать event loop.
+    xlsx пишется write-only книгой openpyxl во временный файл (память не растет
+    с числом строк), csv отдается потоком байтов
+    """
+
+    def __init__(self, model, columns: List[str], batch_size: int = 1000, sheet_title: str = 'Участники'):
+        """
+        Args:
+            model: Модель с менеджером objects
+            columns: Выгружаемые поля
+            batch_size: Строк в одной пачке
+            sheet_title: Название листа xlsx
+        """
+        self.model = model
+        self.columns = columns
+        self.batch_size = batch_size
+        self.sheet_title = sheet_title
+
+    @property
+    def name(self) -> str:
+        """Имя выгрузки: таблица и набор полей"""
+        digest = hashlib.sha1(",".join(self.columns).encode()).hexdigest()[:8]
+        return f"{self.model.__tablename__}-{digest}"
+
+    async def version(self) -> str:
+        """
+        Версия данных: количество строк и max(updated_at) одним запросом
+
+        Меняется при добавлении, удалении и изменении любой строки. Читается
+        с основной базы (реплика отстает), выгрузка затем читается оттуда же
+        """
+        stmt = select(func.count(), func.max(self.model.updated_at)).select_from(self.model)
+        count, updated_at = (await get_session(read_only=False).execute(stmt)).one()
+        raw = f"{count}:{updated_at.isoformat() if updated_at else ''}"
+        return hashlib.sha1(raw.encode()).hexdigest()[:16]
+
+    async def chunks(self) -> AsyncIterator[List[Any]]:
+        """Пачки строк из текущей сессии"""
+        async for rows in self.model.objects.stream(batch_size=self.batch_size, chunks=True, columns=self.columns):
+            yield rows
+
+    async def to_xlsx(self, path: Optional[str] = None) -> str:
+        """
+        Запись xlsx в файл
+
+        Возвращает путь к файлу, без path создается временный файл,
+        удалять его должен вызывающий код
+        """
+        if path is None:
+            fd, path = tempfile.mkstemp(suffix=".xlsx", prefix="users_export_")
+            os.close(fd)
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(self.sheet_title)
+        sheet.append(self.columns)
+        count = 0
+        try:
+            async for rows in self.chunks():
+                await asyncio.to_thread(_xlsx_append, sheet, rows)
+                count += len(rows)
+            await asyncio.to_thread(workbook.save, path)
+        except BaseException:
+            os.remove(path)
+            raise
+        logger.info(f"Выгрузка xlsx: {count} строк")
+        return path
+
+    async def iter_csv(self) -> AsyncIterator[bytes]:
+        """csv потоком байтов (первая строка - заголовок)"""
+        # BOM, чтобы Excel открывал файл в UTF-8
+        yield "\ufeff".encode() + _csv_encode([self.columns])
+        async for rows in self.chunks():
+            yield await asyncio.to_thread(_csv_encode, rows)
+
+    async def to_csv(self, path: str) -> str:
+        """Запись csv в файл"""
+        try:
+            with open(path, "wb") as file:
+                async for data in self.iter_csv():
+                    await asyncio.to_thread(_write_chunk, file, data)
+        except BaseException:
+            os.remove(path)
+            raise
+        return path
+
+
+class ExportSnapshotCache:
+    """
+    Готовые файлы выгрузок на диске
+
+    Файл называется по версии данных (UserExporter.version), поэтому пока
+    пользователи не менялись, повторная выгрузка отдает уже готовый файл.
+    После записи новой версии удаляются все, кроме нее и предыдущей: предыдущую
+    могут еще отдавать запросы, получившие путь до переименования
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def path_for(self, exporter: UserExporter, version: str, format: str) -> str:
+        return os.path.join(self.directory, f"{exporter.name}-{version}.{format}")
+
+    async def get(self, exporter: UserExporter, format: str, version: Optional[str] = None) -> Tuple[str, str]:
+        """Путь к файлу выгрузки текущей версии и сама версия (файл создается при промахе)"""
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат выгрузки: {format}")
+        if version is None:
+            version = await exporter.version()
+        path = self.path_for(exporter, version, format)
+        if os.path.exists(path):
+            self.hits += 1
+            return path, version
+        lock = self._locks.setdefault(path, asyncio.Lock())
+        async with lock:
+            if os.path.exists(path):
+                self.hits += 1
+                return path, version
+            self.misses += 1
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            if format == "xlsx":
+                await exporter.to_xlsx(tmp_path)
+            else:
+                await exporter.to_csv(tmp_path)
+            # переименование атомарно: другие процессы не увидят недописанный файл
+            os.replace(tmp_path, path)
+            self._prune(exporter, format, keep=path)
+        self._locks.pop(path, None)
+        return path, version
+
+    def _prune(self, exporter: UserExporter, format: str, keep: str):
+        """Удаление версий выгрузки старше предыдущей"""
+        old_paths = [
+            old_path for old_path in glob.glob(os.path.join(self.directory, f"{exporter.name}-*.{format}"))
+            if old_path != keep
+        ]
+        old_paths.sort(key=_mtime, reverse=True)
+        for old_path in old_paths[1:]:
+            try:
+                os.remove(old_path)
+            except OSError:
+                pass
+
+
+def _mtime(path: str) -> float:
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+export_cache = ExportSnapshotCache(settings.EXPORT_CACHE_DIR)
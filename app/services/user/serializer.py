@@ -1,21 +1,21 @@
 import os
 import sys
 from marshmallow import fields
-from marshmallow_sqlalchemy import SQLAlchemyAutoSchema
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from app.services.database.serializer import NativeAutoSchema
 from app.services.database.models.applications import Users
 from app.services.database.models.user import UsersLatest
 
-class UserModelSerializer(SQLAlchemyAutoSchema):
+class UserModelSerializer(NativeAutoSchema):
     class Meta:
         model = Users
         load_instance = True
 
 
 
-class ManyUserSerializer(SQLAlchemyAutoSchema):
+class ManyUserSerializer(NativeAutoSchema):
     class Meta:
         model = UsersLatest
         exclude = (
@@ -25,6 +25,7 @@ class ManyUserSerializer(SQLAlchemyAutoSchema):
              'telegram_user_name',
              'is_active',
              'is_admin',
+             'is_bot_blocked',
              'updated_at', 
              'full_name',
              'passport_series',
@@ -37,7 +38,7 @@ class ManyUserSerializer(SQLAlchemyAutoSchema):
              )
 
 
-class ExtendUserModelSerializer(SQLAlchemyAutoSchema):
+class ExtendUserModelSerializer(NativeAutoSchema):
      class Meta:
         model = UsersLatest
         load_instance = True
\ No newline at end of file
@@ -3,10 +3,15 @@ import sys
 from fastapi import APIRouter, HTTPException, Request
 from fastapi.responses import JSONResponse
 from typing import Optional
+from sqlalchemy import select
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from database.context import get_session
 from app.services.database.models.user import UsersLatest
+from app.services.auth.principal import principal_cache
+from app.services.bot.admins import admin_roster
+from app.cors.etag import make_etag
 from app.services.user.serializer import UserModelSerializer, ExtendUserModelSerializer, ManyUserSerializer
 
 
@@ -16,7 +21,22 @@ class UserService:
     def __init__(self, user_model  : UsersLatest):
         self.user_model = user_model
 
+    async def user_etag(self, user) -> str:
+        """
+        ETag профиля: id и время последнего изменения пользователя
+
+        updated_at читается из основной базы: пользователь из кеша авторизации
+        мог устареть, если профиль менялся через другой процесс
+        """
+        result = await get_session(read_only=False).execute(
+            select(self.user_model.updated_at).where(self.user_model.id == user.id)
+        )
+        return make_etag("user", user.id, result.scalar_one_or_none())
+
     async def get_me(self, user, user_serializer = ExtendUserModelSerializer()):
+        """Профиль из основной базы (читается после ETag, поэтому не старше его)"""
+        if user:
+            user = await get_session(read_only=False).get(self.user_model, user.id, populate_existing=True)
         if not user:
             raise HTTPException(404, "Пользователь ненайден")
         user : dict = user_serializer.dump(user)
@@ -30,4 +50,8 @@ class UserService:
         return users
 
     async def update_fields(self, user_id, **filds):
-        self.user_model.objects.update(id = user_id, **filds)
\ No newline at end of file
+        user = await self.user_model.objects.update(user_id, **filds)
+        if user:
+            principal_cache.invalidate(user.telegram_id)
+            admin_roster.invalidate_on_commit()
+        return user
\ No newline at end of file
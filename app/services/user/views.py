@@ -1,8 +1,8 @@
 import os
 import sys
-from fastapi import APIRouter, Depends, HTTPException, Request
-from fastapi.responses import JSONResponse
-from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.responses import FileResponse
+from typing import Literal, Optional
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -10,30 +10,36 @@ from app.services.database.models.applications import  Users
 from app.services.user.serializer import UserModelSerializer
 from app.services.user.deps import get_user_service
 from app.services.user.service import UserService
+from app.services.user.export import UserExporter, EXPORT_FORMATS, MEMBER_EXPORT_COLUMNS, export_cache
+from app.services.database.models.user import UsersLatest
 from app.services.depends import handle_errors_wrraper
+from app.cors.etag import make_etag, etag_matches, not_modified, set_etag
+from app.cors.responses import ORJSONResponse
 
 
 
 user_router = APIRouter(prefix="/users")
 
 @user_router.get("/check/{telegram_id}")
-async def pre_check_user(telegram_id : str):
+async def pre_check_user(telegram_id : str, response : Response):
     user : Optional[Users] = await Users.objects.exists(telegram_id = telegram_id)
     if not user:
-        return JSONResponse({"details" : "Пользователь ненайден", "is_user" : False}, status_code=404)
-    return JSONResponse({"details" : "Пользователь найден", "is_user" : True}, status_code=200)
+        response.status_code = 404
+        return {"details" : "Пользователь ненайден", "is_user" : False}
+    return {"details" : "Пользователь найден", "is_user" : True}
 
 
 private_user_router = APIRouter(prefix="/users")
 
 @private_user_router.get("/me")
-async def pre_check_user(telegram_id : str):
+async def pre_check_user(telegram_id : str, response : Response):
     user : Optional[Users] = await Users.objects.get_by_field("telegram_id", telegram_id)
     if not user:
-        return JSONResponse({"details" : "Пользователь ненайден"}, status_code=404)
+        response.status_code = 404
+        return {"details" : "Пользователь ненайден"}
     user_serializer = UserModelSerializer()
     user : dict = user_serializer.dump(user)
-    return JSONResponse({"details" : "Пользователь найден", "user" : user}, status_code=200)
+    return {"details" : "Пользователь найден", "user" : user}
 
 
 #Private router V2
@@ -43,12 +49,30 @@ private_user_router_v2 = APIRouter(prefix="/users")
 @private_user_router_v2.get("/me")
 async def get_me(request : Request, service : UserService = Depends(get_user_service)):
     user = request.state.user
+    etag = await service.user_etag(user)
+    if etag_matches(request, etag):
+        return not_modified(etag)
     user = await service.get_me(user)
-    return JSONResponse({"details" : "ok", "user" : user}, status_code=200)
+    return set_etag(ORJSONResponse({"details" : "ok", "user" : user}), etag)
    
 @handle_errors_wrraper()
 @private_user_router_v2.get("")
 async def get_users(request : Request, service : UserService = Depends(get_user_service)):
     users = await service.get_users()
-    return JSONResponse({"details" : "ok", "users" : users})
-    
\ No newline at end of file
+    return ORJSONResponse({"details" : "ok", "users" : users})
+
+
+#Admin router V2
+admin_user_router_v2 = APIRouter(prefix="/users")
+
+@handle_errors_wrraper()
+@admin_user_router_v2.get("/export")
+async def export_users(request : Request, format : Literal["xlsx", "csv"] = "xlsx"):
+    """Выгрузка участников в xlsx или csv (готовый файл, пока данные не менялись)"""
+    exporter = UserExporter(UsersLatest, MEMBER_EXPORT_COLUMNS)
+    version = await exporter.version()
+    etag = make_etag(exporter.name, version, format)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    path, _ = await export_cache.get(exporter, format, version)
+    return set_etag(FileResponse(path, media_type=EXPORT_FORMATS[format], filename=f"users.{format}"), etag)
@@ -0,0 +1,16 @@
+import os
+import sys
+
+# Модули импортируются как database.* (services в sys.path) и как app.* (корень репозитория)
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(APP_DIR, "services"))
+sys.path.insert(0, os.path.dirname(APP_DIR))
+
+# Обязательные настройки для импорта модулей без .env (к базе и Telegram тесты не ходят)
+for name, value in {
+    "DB_USER": "test", "DB_PASS": "test", "DB_HOST": "localhost", "DB_NAME": "test", "DB_PORT": "5432",
+    "API_ID": "0", "API_HASH": "test", "TOKEN_BOT": "123456:test", "WEBHOOK_SECRET_TOKEN": "test",
+    "WEBHOOK_TUNNEL_URL": "http://localhost", "WEB_APP_URL": "http://localhost", "ADMIN_SECRET_TOKEN": "test",
+    "TOKEN_ENCODE_ALGORITHM": "HS256", "JWT_SECRET_KEY": "test", "EXPAIR_ACCSES_TIME": "60",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+from sqlalchemy import BigInteger, Boolean, String, update
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Mapped, mapped_column
+
+pytest.importorskip("aiosqlite")
+
+from bot.admins import AdminRoster
+from database.context import get_session, lazy_session
+from database.models.base import Base
+
+
+class RosterUser(Base):
+    """Модель только для тестов списка администраторов"""
+    __tablename__ = "test_roster_users"
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    telegram_id: Mapped[str] = mapped_column(String)
+    is_active: Mapped[bool] = mapped_column(Boolean)
+    is_admin: Mapped[bool] = mapped_column(Boolean)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_demotion_is_applied_after_commit(tmp_path):
+    async def scenario():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'roster.db'}")
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(RosterUser.__table__.create)
+        async with session_factory() as session:
+            session.add(RosterUser(id=1, telegram_id="42", is_active=True, is_admin=True))
+            await session.commit()
+
+        roster = AdminRoster(RosterUser, ttl=3600, session_factory=session_factory)
+        assert await roster.is_admin(42)
+        async with lazy_session(session_factory):
+            await get_session(read_only=False).execute(
+                update(RosterUser).where(RosterUser.id == 1).values(is_admin=False)
+            )
+            roster.invalidate_on_commit()
+            # до коммита список не сбрасывается
+            assert await roster.is_admin(42)
+        assert not await roster.is_admin(42)
+        await engine.dispose()
+    run(scenario())
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.methods import SendMessage
+
+from bot.dispatcher import MessageDispatcher
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeBot:
+    """Бот, который только записывает запросы"""
+
+    def __init__(self, fail_first=None):
+        self.sent = []
+        self.started = time.monotonic()
+        self.fail_first = fail_first
+
+    async def __call__(self, method: SendMessage):
+        if self.fail_first is not None:
+            error, self.fail_first = self.fail_first, None
+            raise error
+        self.sent.append((method.chat_id, method.text, time.monotonic() - self.started))
+        return method.text
+
+
+def test_messages_to_one_chat_keep_order():
+    async def scenario():
+        bot = FakeBot()
+        dispatcher = MessageDispatcher(bot, per_chat_rate=50, concurrency=4)
+        futures = [await dispatcher.send_message(1, f"m{i}") for i in range(5)]
+        assert await asyncio.gather(*futures) == [f"m{i}" for i in range(5)]
+        await dispatcher.stop()
+        assert [text for _, text, _ in bot.sent] == [f"m{i}" for i in range(5)]
+    run(scenario())
+
+
+def test_busy_chat_does_not_block_other_chats():
+    async def scenario():
+        bot = FakeBot()
+        dispatcher = MessageDispatcher(bot, per_chat_rate=2, concurrency=1)
+        busy = [await dispatcher.send_message(1, "busy") for _ in range(3)]
+        others = [await dispatcher.send_message(chat_id, "other") for chat_id in range(2, 6)]
+        await asyncio.gather(*others)
+        # один воркер, но остальные чаты не ждут лимита первого чата
+        assert all(elapsed < 0.3 for chat_id, _, elapsed in bot.sent if chat_id != 1)
+        await asyncio.gather(*busy)
+        await dispatcher.stop()
+    run(scenario())
+
+
+def test_unexpected_error_fails_only_its_message():
+    async def scenario():
+        bot = FakeBot(fail_first=ValueError("boom"))
+        dispatcher = MessageDispatcher(bot, per_chat_rate=50)
+        first = await dispatcher.send_message(1, "first")
+        second = await dispatcher.send_message(1, "second")
+        with pytest.raises(ValueError):
+            await first
+        assert await second == "second"
+        await dispatcher.stop()
+    run(scenario())
+
+
+def test_restart_after_stop_with_pending_messages():
+    async def scenario():
+        bot = FakeBot()
+        dispatcher = MessageDispatcher(bot, per_chat_rate=1)
+        await dispatcher.send_message(1, "sent")
+        pending = await dispatcher.send_message(1, "pending")
+        await dispatcher.stop(timeout=0.1)
+        with pytest.raises(RuntimeError):
+            await pending
+        assert dispatcher.queue_depth == 0
+        # чат не остается помеченным как запланированный
+        future = await dispatcher.send_message(1, "again")
+        assert await asyncio.wait_for(future, 2) == "again"
+        await dispatcher.stop()
+    run(scenario())
@@ -0,0 +1,30 @@
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.methods import SendDocument
+
+from bot.files import is_invalid_file_id
+
+
+def bad_request(message: str) -> TelegramBadRequest:
+    return TelegramBadRequest(SendDocument(chat_id=1, document="file"), message)
+
+
+@pytest.mark.parametrize("message", [
+    "Bad Request: wrong file identifier/HTTP URL specified",
+    "Bad Request: wrong remote file identifier specified: Wrong string length",
+    "Bad Request: FILE_REFERENCE_EXPIRED",
+])
+def test_invalid_file_id_errors(message):
+    assert is_invalid_file_id(bad_request(message))
+
+
+@pytest.mark.parametrize("message", [
+    "Bad Request: chat not found",
+    "Bad Request: message caption is too long",
+    "Bad Request: can't parse entities",
+])
+def test_other_bad_requests_keep_file_id(message):
+    assert not is_invalid_file_id(bad_request(message))
@@ -0,0 +1,49 @@
+import asyncio
+from datetime import datetime
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.cors.responses import ORJSONResponse
+from app.services.application.deps import get_application_service
+from app.services.application.views import admin_application_router_v2, get_applications_by_status
+
+
+class FakeApplicationService:
+    """Сервис заявок с фиксированным ответом"""
+
+    async def applications_etag(self, status: str) -> str:
+        return '"v1"'
+
+    async def get_applications_by_status(self, status: str):
+        return [{"id": 1, "created_at": datetime(2025, 1, 1, 12, 30)}]
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+    app.include_router(admin_application_router_v2)
+    app.dependency_overrides[get_application_service] = FakeApplicationService
+    return TestClient(app)
+
+
+def test_application_list_is_rendered_by_orjson_with_etag():
+    response = make_client().get("/application", params={"status": "active"})
+    assert response.status_code == 200
+    assert response.headers["etag"] == '"v1"'
+    assert response.headers["cache-control"] == "private, no-cache"
+    assert response.json() == {"details": "ok", "applications": [{"id": 1, "created_at": "2025-01-01T12:30:00"}]}
+
+
+def test_application_list_not_modified():
+    response = make_client().get("/application", params={"status": "active"}, headers={"If-None-Match": '"v1"'})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_application_list_view_returns_response_instance():
+    # готовый Response FastAPI отдает как есть, без jsonable_encoder
+    request = Request({"type": "http", "method": "GET", "headers": []})
+    response = asyncio.run(get_applications_by_status(request, "active", FakeApplicationService()))
+    assert isinstance(response, ORJSONResponse)
+    assert response.headers["etag"] == '"v1"'
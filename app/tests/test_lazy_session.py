@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+from sqlalchemy import BigInteger, String, insert, select, text
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.orm import Mapped, mapped_column
+
+pytest.importorskip("aiosqlite")
+
+from database.context import get_session, lazy_session
+from database.models.base import Base
+
+
+class SessionItem(Base):
+    """Модель только для тестов сессии запроса"""
+    __tablename__ = "test_session_items"
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    note: Mapped[str] = mapped_column(String)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def factories(tmp_path):
+    """Основная база и "реплика" - две фабрики сессий над одним файлом"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'session.db'}")
+
+    async def setup():
+        async with engine.begin() as conn:
+            await conn.run_sync(SessionItem.__table__.create)
+        async with async_sessionmaker(engine)() as session:
+            session.add(SessionItem(id=1, name="old", note="old"))
+            await session.commit()
+
+    run(setup())
+    yield async_sessionmaker(engine, expire_on_commit=False), async_sessionmaker(engine, expire_on_commit=False)
+    run(engine.dispose())
+
+
+def read(session_factory):
+    async def load():
+        async with session_factory() as session:
+            return (await session.scalars(select(SessionItem))).one()
+    return run(load())
+
+
+def test_save_replica_object_writes_only_changed_fields(factories):
+    primary, replica = factories
+
+    async def scenario():
+        async with lazy_session(primary, replica, read_only=True):
+            item = await get_session().get(SessionItem, 1)
+            # строку меняет другой процесс, реплика этого еще не видит
+            async with primary() as other:
+                (await other.get(SessionItem, 1)).note = "new"
+                await other.commit()
+            item.name = "renamed"
+            await item.save()
+
+    run(scenario())
+    item = read(primary)
+    assert item.name == "renamed"
+    assert item.note == "new"
+
+
+def test_text_and_core_writes_are_committed(factories):
+    primary, _ = factories
+
+    async def scenario():
+        async with lazy_session(primary):
+            await get_session().execute(text("UPDATE test_session_items SET name = 'text' WHERE id = 1"))
+        async with lazy_session(primary):
+            await get_session().execute(insert(SessionItem).values(id=2, name="core", note=""))
+
+    run(scenario())
+
+    async def names():
+        async with primary() as session:
+            return set(await session.scalars(select(SessionItem.name)))
+    assert run(names()) == {"text", "core"}
+
+
+def test_reads_do_not_commit(factories):
+    primary, _ = factories
+
+    async def scenario():
+        async with lazy_session(primary) as lazy:
+            await get_session().execute(text("SELECT name FROM test_session_items"))
+            await get_session().execute(select(SessionItem))
+            assert not lazy.has_writes
+    run(scenario())
@@ -0,0 +1,12 @@
+from app.cors.metrics import metrics_authorized
+
+
+def test_metrics_require_configured_bearer_token():
+    assert metrics_authorized("Bearer secret", "secret")
+    assert metrics_authorized("bearer secret", "secret")
+    assert not metrics_authorized("Bearer wrong", "secret")
+    assert not metrics_authorized("Basic secret", "secret")
+    assert not metrics_authorized(None, "secret")
+    # без настроенного токена метрики закрыты
+    assert not metrics_authorized("Bearer ", None)
+    assert not metrics_authorized("Bearer secret", None)
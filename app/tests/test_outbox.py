@@ -0,0 +1,111 @@
+import asyncio
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.exceptions import TelegramForbiddenError, TelegramNetworkError
+from aiogram.methods import SendMessage
+
+from bot.outbox import OutboxWorker
+
+# Захват строк проверяется только на PostgreSQL (FOR UPDATE SKIP LOCKED)
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+class FakeDispatcher:
+    """Диспетчер, который сразу возвращает заданный результат"""
+
+    def __init__(self, events, results=None):
+        self.events = events
+        self.results = results or {}
+
+    async def send_message(self, chat_id, text, **kwargs):
+        self.events.append(("send", chat_id))
+        future = asyncio.get_running_loop().create_future()
+        result = self.results.get(chat_id, text)
+        if isinstance(result, BaseException):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
+        return future
+
+
+def row(id, attempts=1, chat_id="1"):
+    return SimpleNamespace(id=id, chat_id=chat_id, text="text", reply_markup=None, attempts=attempts)
+
+
+def test_retry_delay():
+    worker = OutboxWorker(FakeDispatcher([]), session_factory=None, max_attempts=3, base_delay=5, max_delay=8)
+    method = SendMessage(chat_id=1, text="text")
+    assert worker.retry_delay(row(1), "ok") is None
+    assert worker.retry_delay(row(1), TelegramForbiddenError(method, "blocked")) is None
+    assert worker.retry_delay(row(1, attempts=1), TelegramNetworkError(method, "timeout")) == 5
+    assert worker.retry_delay(row(1, attempts=2), TelegramNetworkError(method, "timeout")) == 8
+    assert worker.retry_delay(row(1, attempts=3), TelegramNetworkError(method, "timeout")) is None
+
+
+def test_process_batch_sends_between_transactions():
+    async def scenario():
+        events = []
+        worker = OutboxWorker(FakeDispatcher(events), session_factory=None)
+
+        async def claim():
+            events.append(("claim",))
+            return [row(1, chat_id="a"), row(2, chat_id="b")]
+
+        async def save_results(rows, results):
+            events.append(("save", [r.id for r in rows], results))
+
+        worker._claim = claim
+        worker._save_results = save_results
+        assert await worker.process_batch() == 2
+        assert events == [("claim",), ("send", "a"), ("send", "b"), ("save", [1, 2], ["text", "text"])]
+    run(scenario())
+
+
+@pytest.mark.skipif(not TEST_DATABASE_URL, reason="нужен TEST_DATABASE_URL с PostgreSQL")
+def test_claim_does_not_overlap_and_save_results():
+    from sqlalchemy import select, delete
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from database.models.outbox import NotificationOutbox
+
+    async def scenario():
+        engine = create_async_engine(TEST_DATABASE_URL)
+        session_factory = async_sessionmaker(engine, expire_on_commit=False)
+        async with engine.begin() as conn:
+            await conn.run_sync(NotificationOutbox.__table__.create, checkfirst=True)
+            await conn.execute(delete(NotificationOutbox))
+        async with session_factory() as session:
+            session.add_all(NotificationOutbox(chat_id=str(i), text="text") for i in range(6))
+            await session.commit()
+
+        first = OutboxWorker(FakeDispatcher([]), session_factory=session_factory, batch_size=3)
+        second = OutboxWorker(FakeDispatcher([]), session_factory=session_factory, batch_size=3)
+        claimed_first, claimed_second = await asyncio.gather(first._claim(), second._claim())
+        ids_first = {r.id for r in claimed_first}
+        ids_second = {r.id for r in claimed_second}
+        assert len(ids_first) == len(ids_second) == 3
+        assert not ids_first & ids_second
+        assert all(r.attempts == 1 for r in claimed_first + claimed_second)
+        # захваченные строки отложены на lease и повторно не выдаются
+        assert await first._claim() == []
+
+        failed, delivered = claimed_first[0], claimed_first[1:]
+        method = SendMessage(chat_id=1, text="text")
+        await first._save_results(
+            claimed_first,
+            [TelegramNetworkError(method, "timeout")] + ["ok"] * len(delivered)
+        )
+        async with session_factory() as session:
+            rows = {r.id: r for r in await session.scalars(select(NotificationOutbox))}
+        assert failed.id in rows and rows[failed.id].last_error
+        assert not any(r.id in rows for r in delivered)
+        await engine.dispose()
+    run(scenario())
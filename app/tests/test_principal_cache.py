@@ -0,0 +1,52 @@
+import asyncio
+
+from sqlalchemy import BigInteger, String
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.services.auth.principal import PrincipalCache
+from database.context import reset_session, set_session
+from database.models.base import Base
+
+
+class PrincipalItem(Base):
+    """Модель только для тестов кеша пользователей"""
+    __tablename__ = "test_principal_items"
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    telegram_id: Mapped[str] = mapped_column(String)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+async def restore_in_new_session(data):
+    session = AsyncSession()
+    token = set_session(session)
+    try:
+        return session, await PrincipalItem.objects.from_snapshot(data)
+    finally:
+        reset_session(token)
+
+
+def test_cached_user_is_attached_to_each_request_session():
+    async def scenario():
+        cache = PrincipalCache(ttl=60)
+        cache.set("42", PrincipalItem.objects.snapshot(PrincipalItem(id=1, telegram_id="42")))
+        found, snapshot = cache.get("42")
+        assert found and snapshot == {"id": 1, "telegram_id": "42"}
+        first_session, first = await restore_in_new_session(snapshot)
+        second_session, second = await restore_in_new_session(snapshot)
+        assert first is not second
+        assert first in first_session and second in second_session
+        await first_session.close()
+        await second_session.close()
+    run(scenario())
+
+
+def test_negative_result_and_invalidate():
+    cache = PrincipalCache(ttl=60, negative_ttl=60)
+    cache.set("1", None)
+    assert cache.get("1") == (True, None)
+    cache.invalidate("1")
+    assert cache.get("1") == (False, None)
@@ -0,0 +1,145 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import BigInteger, String, DateTime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapped, mapped_column
+
+from database.cache import MemoryCacheBackend, QueryCache, create_query_cache
+from database.context import run_commit_hooks
+from database.manager import BaseManager
+from database.models.base import Base
+
+
+class CachedItem(Base):
+    """Модель только для тестов кеша"""
+    __tablename__ = "test_cached_items"
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    name: Mapped[str] = mapped_column(String)
+    created_at: Mapped[datetime] = mapped_column(DateTime)
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+@pytest.fixture
+def cache():
+    cache = QueryCache(MemoryCacheBackend(maxsize=100), default_ttl=60)
+    BaseManager.configure_cache(cache)
+    yield cache
+    BaseManager.configure_cache(None)
+
+
+def test_memory_backend_ttl_and_lru():
+    async def scenario():
+        backend = MemoryCacheBackend(maxsize=2)
+        await backend.set("a", 1, ttl=60)
+        await backend.set("b", 2, ttl=60)
+        assert await backend.get("a") == 1
+        # "b" вытесняется как давно не использованный
+        await backend.set("c", 3, ttl=60)
+        assert await backend.get("b") is None
+        assert await backend.get("a") == 1
+        await backend.set("expired", 4, ttl=0)
+        assert await backend.get("expired") is None
+    run(scenario())
+
+
+def test_none_value_is_cached(cache):
+    async def scenario():
+        key = await cache.make_key(CachedItem, "get", 1)
+        assert await cache.get(CachedItem, key) == (False, None)
+        await cache.set(CachedItem, key, None)
+        assert await cache.get(CachedItem, key) == (True, None)
+    run(scenario())
+
+
+def test_invalidate_changes_version(cache):
+    async def scenario():
+        key = await cache.make_key(CachedItem, "filter", [("name", "a")])
+        await cache.set(CachedItem, key, ["a"])
+        await cache.invalidate(CachedItem)
+        new_key = await cache.make_key(CachedItem, "filter", [("name", "a")])
+        assert new_key != key
+        assert await cache.get(CachedItem, new_key) == (False, None)
+        stats = cache.stats()[CachedItem.__tablename__]
+        assert stats["misses"] == 1
+    run(scenario())
+
+
+def test_zero_ttl_disables_cache_for_model():
+    cache = QueryCache(MemoryCacheBackend(), default_ttl=60, ttl={CachedItem.__tablename__: 0})
+    BaseManager.configure_cache(cache)
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return len(calls)
+
+    try:
+        assert not cache.enabled_for(CachedItem)
+        assert run(CachedItem.objects._cached("exists", [], load=load)) == 1
+        assert run(CachedItem.objects._cached("exists", [], load=load)) == 2
+    finally:
+        BaseManager.configure_cache(None)
+
+
+def test_cached_read_hits_until_write(cache):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        assert await CachedItem.objects._cached("count", [], load=load) == 1
+        assert await CachedItem.objects._cached("count", [], load=load) == 1
+        await CachedItem.objects.invalidate_cache()
+        assert await CachedItem.objects._cached("count", [], load=load) == 2
+    run(scenario())
+
+
+def test_notify_changed_invalidates_again_after_commit(cache):
+    calls = []
+
+    async def load():
+        calls.append(1)
+        return len(calls)
+
+    async def scenario():
+        session = AsyncSession()
+        await CachedItem.objects.notify_changed(session)
+        # чтение между записью и коммитом кеширует еще не закоммиченные данные
+        assert await CachedItem.objects._cached("count", [], load=load) == 1
+        assert await CachedItem.objects._cached("count", [], load=load) == 1
+        await run_commit_hooks(session)
+        assert await CachedItem.objects._cached("count", [], load=load) == 2
+        await session.close()
+    run(scenario())
+
+
+def test_restore_merges_without_query():
+    async def scenario():
+        session = AsyncSession()
+        item = CachedItem(id=7, name="cached", created_at=datetime(2025, 1, 1))
+        data = CachedItem.objects._dump(item)
+        restored = await CachedItem.objects._restore(session, data)
+        assert restored in session
+        assert restored.id == 7 and restored.name == "cached"
+        assert restored.created_at == datetime(2025, 1, 1)
+        # объект уже в identity map, повторное восстановление возвращает его же
+        assert await CachedItem.objects._restore(session, data) is restored
+        assert await CachedItem.objects._restore(session, None) is None
+        await session.close()
+    run(scenario())
+
+
+def test_create_query_cache_backends():
+    assert create_query_cache("none") is None
+    assert isinstance(create_query_cache("memory").backend, MemoryCacheBackend)
+    with pytest.raises(ValueError):
+        create_query_cache("redis")
+    with pytest.raises(ValueError):
+        create_query_cache("memcached")
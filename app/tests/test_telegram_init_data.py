@@ -0,0 +1,38 @@
+import hashlib
+import hmac
+import json
+import time
+import urllib.parse
+
+from app.services.auth.telegram import TelegramInitDataVerifier
+
+BOT_TOKEN = "123456:test"
+
+
+def sign(auth_date: int, user_id: int = 42, token: str = BOT_TOKEN) -> str:
+    params = {"auth_date": str(auth_date), "user": json.dumps({"id": user_id})}
+    secret = hmac.new(b"WebAppData", token.encode(), hashlib.sha256).digest()
+    data_check_string = "\n".join(f"{key}={params[key]}" for key in sorted(params))
+    params["hash"] = hmac.new(secret, data_check_string.encode(), hashlib.sha256).hexdigest()
+    return urllib.parse.urlencode(params)
+
+
+def test_valid_init_data_is_cached_by_hash():
+    verifier = TelegramInitDataVerifier(BOT_TOKEN, max_age=3600)
+    init_data = sign(int(time.time()))
+    assert verifier.get_user_id(init_data) == 42
+    assert verifier.get_user_id(init_data) == 42
+    assert verifier.hits == 1
+    # в кеше хранится только sha256, а не сама строка
+    assert list(verifier._cache) == [hashlib.sha256(init_data.encode()).digest()]
+
+
+def test_expired_init_data_is_rejected():
+    verifier = TelegramInitDataVerifier(BOT_TOKEN, max_age=3600)
+    assert verifier.verify(sign(int(time.time()) - 7200)) is None
+    assert not verifier._cache
+
+
+def test_wrong_signature_is_rejected():
+    verifier = TelegramInitDataVerifier(BOT_TOKEN, max_age=3600)
+    assert verifier.verify(sign(int(time.time()), token="654321:other")) is None
@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("aiogram")
+
+from aiogram.types import Chat, Message, Update
+
+from bot.workers import UpdateWorkerPool
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def make_update(update_id: int, chat_id: int, text: str = "text") -> Update:
+    chat = Chat(id=chat_id, type="private")
+    return Update(update_id=update_id, message=Message(message_id=update_id, date=datetime.now(), chat=chat, text=text))
+
+
+class FakeDispatcher:
+    """Диспетчер aiogram, который записывает обработанные обновления"""
+
+    def __init__(self, slow_chats=(), delay: float = 0.5):
+        self.handled = []
+        self.slow_chats = set(slow_chats)
+        self.delay = delay
+
+    async def feed_update(self, bot, update: Update):
+        chat_id = update.message.chat.id
+        if chat_id in self.slow_chats:
+            await asyncio.sleep(self.delay)
+        self.handled.append((chat_id, update.update_id))
+
+
+def test_updates_of_one_chat_keep_order():
+    async def scenario():
+        dp = FakeDispatcher()
+        pool = UpdateWorkerPool(dp, bot=None, workers=4)
+        await pool.start()
+        for update_id in range(10):
+            assert pool.submit(make_update(update_id, chat_id=update_id % 2))
+        await pool.stop()
+        for chat_id in (0, 1):
+            handled = [update_id for chat, update_id in dp.handled if chat == chat_id]
+            assert handled == sorted(handled)
+        assert len(dp.handled) == 10
+    run(scenario())
+
+
+def test_slow_chat_does_not_block_other_chats():
+    async def scenario():
+        dp = FakeDispatcher(slow_chats={1})
+        pool = UpdateWorkerPool(dp, bot=None, workers=2)
+        await pool.start()
+        pool.submit(make_update(1, chat_id=1))
+        pool.submit(make_update(2, chat_id=1))
+        for update_id in range(3, 8):
+            pool.submit(make_update(update_id, chat_id=update_id))
+        await asyncio.sleep(0.2)
+        # медленный чат занимает один воркер, остальные чаты уже обработаны
+        assert {chat for chat, _ in dp.handled} == set(range(3, 8))
+        await pool.stop()
+        assert [update_id for chat, update_id in dp.handled if chat == 1] == [1, 2]
+    run(scenario())
+
+
+def test_duplicate_update_is_processed_once():
+    async def scenario():
+        dp = FakeDispatcher()
+        pool = UpdateWorkerPool(dp, bot=None, workers=2)
+        await pool.start()
+        assert pool.submit(make_update(1, chat_id=1))
+        assert pool.submit(make_update(1, chat_id=1))
+        await pool.stop()
+        assert dp.handled == [(1, 1)]
+    run(scenario())
+
+
+def test_submit_rejects_when_queue_is_full():
+    async def scenario():
+        dp = FakeDispatcher(slow_chats={1})
+        pool = UpdateWorkerPool(dp, bot=None, workers=1, max_queue=2)
+        await pool.start()
+        assert pool.submit(make_update(1, chat_id=1))
+        await asyncio.sleep(0)
+        assert pool.submit(make_update(2, chat_id=1))
+        assert pool.submit(make_update(3, chat_id=2))
+        assert not pool.submit(make_update(4, chat_id=3))
+        await pool.stop()
+    run(scenario())